@@ -1,3 +1,8 @@
 """
 AutoGen Coding Agent Package
 """
+
+import logging
+
+# Library default: stay silent unless an entry point configures output
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -7,49 +7,110 @@ It supports multiple specialized agents and configurable project types.
 """
 
 import argparse
+import asyncio
+import functools
+import logging
+import sys
 from dotenv import load_dotenv
-from pathlib import Path
 import os
-import yaml
 
 # Import our modular utilities
 from agent.utils import (
     load_config,
-    embed_codebase,
+    load_or_build_db,
+    get_query_cache_path,
+    SemanticQueryCache,
     query_codebase,
+    query_codebase_by_vector,
     load_tasks,
+    peek_tasks_head,
     create_agents,
     run_agent_conversation,
-    # New multi-agent components
-    create_agent_group,
-    run_multi_agent_workflow,
-    load_mcp_config
+    ensure_dir
 )
 
 # Load environment variables
 load_dotenv()
 
+log = logging.getLogger("agent")
+
+# File extensions to embed for different project types
+FILE_EXTENSIONS = {
+    "web": frozenset({".html", ".css", ".js", ".jsx", ".ts", ".tsx", ".json"}),
+    "python": frozenset({".py", ".ipynb", ".pyx", ".pyi", ".pyd", ".pyc"}),
+    "javascript": frozenset({".js", ".jsx", ".ts", ".tsx", ".json", ".mjs", ".cjs"}),
+    "java": frozenset({".java", ".class", ".jar", ".properties", ".xml"}),
+    "game": frozenset({".js", ".html", ".css", ".unity", ".cs", ".ts", ".cpp", ".h", ".py"}),
+    "generic": frozenset({".py", ".js", ".ts", ".java", ".cpp", ".c", ".h", ".md", ".txt", ".html", ".css", ".json"})
+}
+
+# Environment variables backing each option, with the fallback default
+_ENV_DEFAULTS = {
+    "project_dir": ("AGENT_PROJECT_DIR", "project-code"),
+    "tasks_file": ("AGENT_TASKS_FILE", "tasks.md"),
+    "query": ("AGENT_QUERY", ""),
+    "project_type": ("AGENT_PROJECT_TYPE", "generic"),
+    "mcp_config": ("AGENT_MCP_CONFIG", ".mcp.yaml"),
+}
+_ENV_FLAG_DEFAULTS = {
+    "multi_agent": ("AGENT_USE_MULTI", "false"),
+    "verbose": ("AGENT_VERBOSE", "true"),
+}
+
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command line parser (once per process)"""
+    parser = argparse.ArgumentParser(description="AutoGen Coding Agent")
+    parser.add_argument("--project-dir", help="Target project directory to analyze")
+    parser.add_argument("--tasks-file", help="Path to tasks file")
+    parser.add_argument("--query", help="Search query for code context")
+    parser.add_argument("--project-type", help="Type of project (web, python, javascript, java, game, etc.)")
+    parser.add_argument("--mcp-config", help="Path to MCP configuration file")
+    parser.add_argument("--multi-agent", help="Use the multi-agent system", 
+                       action="store_true", default=None)
+    parser.add_argument("--verbose", help="Enable verbose output", 
+                       action="store_true", default=None)
+    return parser
+
+def _parse_args(argv=None):
+    """
+    Parse command line arguments, filling unset options from the environment
+    
+    Args:
+        argv (list, optional): Arguments to parse instead of sys.argv
+        
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    args = _build_parser().parse_args(argv)
+    
+    # Environment defaults are only consulted for options not given on the command line
+    env = os.environ
+    for dest, (var, default) in _ENV_DEFAULTS.items():
+        if getattr(args, dest) is None:
+            setattr(args, dest, env.get(var, default))
+    for dest, (var, default) in _ENV_FLAG_DEFAULTS.items():
+        if getattr(args, dest) is None:
+            setattr(args, dest, env.get(var, default).lower() == "true")
+    
+    return args
+
+def _configure_logging(verbose):
+    """Send the agent's progress messages to stdout when verbose, warnings otherwise"""
+    log.setLevel(logging.INFO if verbose else logging.WARNING)
+    if not any(isinstance(h, logging.StreamHandler) for h in log.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(handler)
+    # Other modules configure the root logger; don't print messages twice
+    log.propagate = False
+
 def main():
     """
     Main function to run the AutoGen Coding Agent
     """
     # Parse command line arguments
-    parser = argparse.ArgumentParser(description="AutoGen Coding Agent")
-    parser.add_argument("--project-dir", help="Target project directory to analyze", 
-                       default=os.environ.get("AGENT_PROJECT_DIR", "project-code"))
-    parser.add_argument("--tasks-file", help="Path to tasks file", 
-                       default=os.environ.get("AGENT_TASKS_FILE", "tasks.md"))
-    parser.add_argument("--query", help="Search query for code context", 
-                       default=os.environ.get("AGENT_QUERY", ""))
-    parser.add_argument("--project-type", help="Type of project (web, python, javascript, java, game, etc.)", 
-                       default=os.environ.get("AGENT_PROJECT_TYPE", "generic"))
-    parser.add_argument("--mcp-config", help="Path to MCP configuration file", 
-                       default=os.environ.get("AGENT_MCP_CONFIG", ".mcp.yaml"))
-    parser.add_argument("--multi-agent", help="Use the multi-agent system", 
-                       action="store_true", default=os.environ.get("AGENT_USE_MULTI", "false").lower() == "true")
-    parser.add_argument("--verbose", help="Enable verbose output", 
-                       action="store_true", default=os.environ.get("AGENT_VERBOSE", "true").lower() == "true")
-    args = parser.parse_args()
+    args = _parse_args()
     
     # Load configuration
     config = load_config()
@@ -59,74 +120,102 @@ def main():
         config["agent"] = config.get("agent", {})
         config["agent"]["verbose"] = True
     
-    if config.get("agent", {}).get("verbose", True):
-        print("Starting AutoGen Coding Agent...")
-        print(f"Using model: {config.get('llm', {}).get('model', 'gpt-4')}")
-        print(f"Project directory: {args.project_dir}")
-        print(f"Tasks file: {args.tasks_file}")
-        print(f"Project type: {args.project_type}")
-        if args.multi_agent:
-            print("Using multi-agent system")
+    _configure_logging(config.get("agent", {}).get("verbose", True))
+    
+    log.info("Starting AutoGen Coding Agent...")
+    log.info("Using model: %s", config.get('llm', {}).get('model', 'gpt-4'))
+    log.info("Project directory: %s", args.project_dir)
+    log.info("Tasks file: %s", args.tasks_file)
+    log.info("Project type: %s", args.project_type)
+    if args.multi_agent:
+        log.info("Using multi-agent system")
+    
+    asyncio.run(_main_async(args, config))
+
+async def _main_async(args, config):
+    """
+    Run the agent pipeline, overlapping independent I/O-bound startup steps
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+        config (dict): Configuration dictionary
+    """
+    # Reading the tasks file does not depend on anything else; start it right away
+    tasks_task = asyncio.create_task(asyncio.to_thread(load_tasks, args.tasks_file))
     
     # Try to load MCP config to enhance project_type and other settings
+    from agent.utils import load_mcp_config
     try:
-        mcp_config = load_mcp_config(args.mcp_config)
+        mcp_config = await asyncio.to_thread(load_mcp_config, args.mcp_config)
         # Update project type if specified in MCP config
         if "metadata" in mcp_config and "type" in mcp_config["metadata"]:
             project_type_from_mcp = mcp_config["metadata"]["type"].lower()
             if project_type_from_mcp and project_type_from_mcp != "generic":
                 args.project_type = project_type_from_mcp
-                if config.get("agent", {}).get("verbose", True):
-                    print(f"Using project type from MCP config: {args.project_type}")
+                log.info("Using project type from MCP config: %s", args.project_type)
     except Exception as e:
-        if config.get("agent", {}).get("verbose", True):
-            print(f"Could not load MCP config: {e}")
-    
-    # Define file extensions for different project types
-    file_extensions = {
-        "web": [".html", ".css", ".js", ".jsx", ".ts", ".tsx", ".json"],
-        "python": [".py", ".ipynb", ".pyx", ".pyi", ".pyd", ".pyc"],
-        "javascript": [".js", ".jsx", ".ts", ".tsx", ".json", ".mjs", ".cjs"],
-        "java": [".java", ".class", ".jar", ".properties", ".xml"],
-        "game": [".js", ".html", ".css", ".unity", ".cs", ".ts", ".cpp", ".h", ".py"],
-        "generic": [".py", ".js", ".ts", ".java", ".cpp", ".c", ".h", ".md", ".txt", ".html", ".css", ".json"]
-    }
+        log.info("Could not load MCP config: %s", e)
     
     # Use project type to customize behavior
     project_type = args.project_type.lower()
-    extensions = file_extensions.get(project_type, file_extensions["generic"])
+    extensions = FILE_EXTENSIONS.get(project_type, FILE_EXTENSIONS["generic"])
       
     # Create project directory if it doesn't exist
-    if not os.path.exists(args.project_dir):
-        os.makedirs(args.project_dir, exist_ok=True)
-        if config.get("agent", {}).get("verbose", True):
-            print(f"Created project directory: {args.project_dir}")
-    
-    # Embed the codebase
-    db = embed_codebase(config, code_dir=args.project_dir, tasks_file=args.tasks_file, 
-                       file_extensions=extensions)
-    
-    # Load tasks
-    tasks = load_tasks(args.tasks_file)
-    if config.get("agent", {}).get("verbose", True):
-        print("Loaded tasks:")
-        print(tasks)
+    if ensure_dir(args.project_dir):
+        log.info("Created project directory: %s", args.project_dir)
     
     # Determine the search query based on tasks if none provided
     search_query = args.query
     if not search_query:
-        # Extract a basic query from the tasks content
-        search_query = tasks[:100]  # Use first 100 chars of tasks as default query
-        if config.get("agent", {}).get("verbose", True):
-            print(f"Using auto-generated query: {search_query}")
+        # Use the first 100 chars of tasks as default query; only those are read here
+        search_query = peek_tasks_head(args.tasks_file, 100)
+        log.info("Using auto-generated query: %s", search_query)
     
-    # Query for relevant code based on tasks
-    code_context = query_codebase(db, search_query, config)
+    # Without a persisted index the simple workflow runs a single query, so
+    # embed and search in one pass instead of building a FAISS index
+    fused = not args.multi_agent and not config.get("rag", {}).get("persist_index", True)
+    
+    # Embed the codebase (re-embeds only files changed since the last run);
+    # the simple workflow's agents are built while the embedding runs
+    if fused:
+        from agent.utils import embed_and_query
+        db_task = asyncio.to_thread(embed_and_query, config, search_query, code_dir=args.project_dir,
+                                    tasks_file=args.tasks_file, file_extensions=extensions)
+    else:
+        db_task = asyncio.to_thread(load_or_build_db, config, code_dir=args.project_dir,
+                                    tasks_file=args.tasks_file, file_extensions=extensions)
+    if args.multi_agent:
+        db = await db_task
+    else:
+        agents_task = asyncio.to_thread(create_agents, config, project_type=project_type)
+        db, (assistant, user) = await asyncio.gather(db_task, agents_task)
+    
+    # Query for relevant code based on tasks, reusing results for repeated or similar queries
+    if fused:
+        code_context = db
+    elif db is None:
+        code_context = query_codebase(db, search_query, config)
+    else:
+        embed_fn = getattr(db.embedding_function, "embed_query", db.embedding_function)
+        with SemanticQueryCache(get_query_cache_path(config, args.project_dir)) as qcache:
+            # A miss searches with the embedding the lookup already made
+            code_context = qcache.get_or_compute(
+                search_query,
+                lambda q, embedding: query_codebase_by_vector(db, embedding, config),
+                embed_fn=embed_fn,
+                pass_embedding=True
+            )
+    
+    # The agents need the full task list from here on
+    tasks = await tasks_task
+    log.info("Loaded tasks:\n%s", tasks)
     
     # Decide whether to use multi-agent or simple agent system
     if args.multi_agent:
-        if config.get("agent", {}).get("verbose", True):
-            print("Running multi-agent workflow...")
+        log.info("Running multi-agent workflow...")
+        
+        # Imported here so the simple workflow never loads the multi-agent machinery
+        from agent.utils import run_multi_agent_workflow
         
         # Run the multi-agent workflow
         run_multi_agent_workflow(
@@ -137,11 +226,7 @@ def main():
             project_type=project_type
         )
     else:
-        if config.get("agent", {}).get("verbose", True):
-            print("Running simple agent workflow...")
-        
-        # Create agents
-        assistant, user = create_agents(config, project_type=project_type)
+        log.info("Running simple agent workflow...")
         
         # Run the conversation
         run_agent_conversation(user, assistant, code_context, tasks, project_dir=args.project_dir)
@@ -5,17 +5,20 @@ This package contains extension modules that add additional functionality
 to the core agent. Extensions can be easily enabled/disabled through configuration.
 """
 
-from .git_integration import GIT_FUNCTION_MAP
+from collections import ChainMap
+from importlib import import_module
+from types import MappingProxyType
 
-# Registry of available extensions
-AVAILABLE_EXTENSIONS = {
-    "git": {
+# Registry of available extensions (read-only); an extension module is only
+# imported once the extension is enabled and its function map is requested
+AVAILABLE_EXTENSIONS = MappingProxyType({
+    "git": MappingProxyType({
         "name": "Git Integration",
         "description": "Provides Git version control functionality",
-        "function_map": GIT_FUNCTION_MAP,
+        "load_function_map": lambda: import_module(".git_integration", __name__).GIT_FUNCTION_MAP,
         "config_key": "git_integration"
-    }
-}
+    })
+})
 
 def load_extensions(config):
     """
@@ -25,22 +28,23 @@ def load_extensions(config):
         config (dict): Configuration dictionary
         
     Returns:
-        dict: Combined function map from all enabled extensions
+        Mapping: Combined (read-only) function map from all enabled extensions
     """
-    function_map = {}
-    
     extensions_config = config.get("extensions", {})
+    enabled = [ext_info for ext_info in AVAILABLE_EXTENSIONS.values()
+               if extensions_config.get(ext_info["config_key"], False)]
     
-    for ext_id, ext_info in AVAILABLE_EXTENSIONS.items():
-        config_key = ext_info["config_key"]
-        
-        if extensions_config.get(config_key, False):
-            print(f"Loading extension: {ext_info['name']}")
-            function_map.update(ext_info["function_map"])
-        else:
-            print(f"Extension disabled: {ext_info['name']}")
+    if config.get("agent", {}).get("verbose", True):
+        print(f"Loaded extensions: {[ext_info['name'] for ext_info in enabled]}")
     
-    return function_map
+    # Hand out the extensions' own maps instead of copying them
+    function_maps = [ext_info["load_function_map"]() for ext_info in enabled]
+    if not function_maps:
+        return MappingProxyType({})
+    if len(function_maps) == 1:
+        return function_maps[0]
+    # Later extensions win, as they did when the maps were merged with update()
+    return ChainMap(*reversed(function_maps))
 
 def get_available_extensions():
     """
@@ -49,4 +53,4 @@ def get_available_extensions():
     Returns:
         dict: Dictionary of available extensions with their info
     """
-    return AVAILABLE_EXTENSIONS.copy()
+    return dict(AVAILABLE_EXTENSIONS)
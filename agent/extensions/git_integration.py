@@ -2,11 +2,79 @@
 Git Integration Extension for AutoGen Coding Agent
 
 This extension adds Git functionality to the coding agent.
+When pygit2 (libgit2) is installed, init, add and status run in-process;
+otherwise they fall back to invoking the git command-line tool. Commits always
+go through the git command-line tool so hooks and commit signing still apply.
 """
 
 import subprocess
 import os
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+# Above this many paths, git add reads its pathspecs from stdin instead of argv
+GIT_ADD_ARGV_LIMIT = 1000
+
+# Open pygit2 repositories keyed by absolute repo_path
+_repo_cache = {}
+
+def _open_repo(repo_path):
+    """
+    Open (and cache) the repository containing repo_path via pygit2
+    
+    Bare repositories have no work tree to add files from, so they are left
+    to the git command-line tool.
+    
+    Returns:
+        pygit2.Repository or None if pygit2 is unavailable or no non-bare
+        repository was found
+    """
+    if pygit2 is None:
+        return None
+    
+    key = os.path.abspath(repo_path)
+    repo = _repo_cache.get(key)
+    if repo is not None and not os.path.isdir(repo.path):
+        # The repository was removed since it was opened
+        del _repo_cache[key]
+        repo = None
+    if repo is None:
+        git_dir = pygit2.discover_repository(key)
+        if git_dir is None:
+            return None
+        repo = pygit2.Repository(git_dir)
+        if repo.is_bare:
+            return None
+        _repo_cache[key] = repo
+    return repo
+
+if pygit2 is not None:
+    # Porcelain status letters for pygit2 status flags, in precedence order
+    _INDEX_STATUS_CODES = (
+        (pygit2.GIT_STATUS_INDEX_NEW, "A"),
+        (pygit2.GIT_STATUS_INDEX_MODIFIED, "M"),
+        (pygit2.GIT_STATUS_INDEX_DELETED, "D"),
+        (pygit2.GIT_STATUS_INDEX_RENAMED, "R"),
+        (pygit2.GIT_STATUS_INDEX_TYPECHANGE, "T"),
+    )
+    _WORKTREE_STATUS_CODES = (
+        (pygit2.GIT_STATUS_WT_MODIFIED, "M"),
+        (pygit2.GIT_STATUS_WT_DELETED, "D"),
+        (pygit2.GIT_STATUS_WT_RENAMED, "R"),
+        (pygit2.GIT_STATUS_WT_TYPECHANGE, "T"),
+    )
+    # A path is untracked when it is new in the work tree and unknown to the index
+    _UNTRACKED_FLAGS = pygit2.GIT_STATUS_WT_NEW | pygit2.GIT_STATUS_INDEX_NEW | pygit2.GIT_STATUS_INDEX_MODIFIED
+
+def _repo_relative(repo, repo_path, file):
+    """Convert a path relative to repo_path into one relative to the work tree"""
+    abs_path = os.path.join(os.path.abspath(repo_path), file)
+    return Path(os.path.relpath(abs_path, repo.workdir)).as_posix()
 
 def git_init(repo_path="."):
     """
@@ -18,6 +86,15 @@ def git_init(repo_path="."):
     Returns:
         str: Success message or error message
     """
+    if pygit2 is not None:
+        try:
+            pygit2.init_repository(repo_path)
+            # Cached repositories under repo_path may have been replaced
+            _repo_cache.clear()
+            return f"Git repository initialized in {repo_path}"
+        except pygit2.GitError as e:
+            return f"Error initializing git repository: {e}"
+    
     try:
         result = subprocess.run(
             ["git", "init"],
@@ -43,13 +120,48 @@ def git_add(files, repo_path="."):
     Returns:
         str: Success message or error message
     """
+    if isinstance(files, str):
+        files = [files]
+    else:
+        files = list(files)
+    
+    repo = _open_repo(repo_path)
+    if repo is not None:
+        try:
+            index = repo.index
+            index.read()
+            present, deleted = [], []
+            for f in files:
+                path = _repo_relative(repo, repo_path, f)
+                if os.path.exists(os.path.join(repo.workdir, path)):
+                    present.append(path)
+                elif path in index:
+                    deleted.append(path)
+                else:
+                    return f"Error adding files to git: pathspec '{f}' did not match any files"
+            if present:
+                index.add_all(present)
+            if deleted:
+                index.remove_all(deleted)
+            index.write()
+            return f"Added {len(files)} file(s) to git staging area"
+        except pygit2.GitError as e:
+            return f"Error adding files to git: {e}"
+    
     try:
-        if isinstance(files, str):
-            files = [files]
-        
-        for file in files:
+        if len(files) > GIT_ADD_ARGV_LIMIT:
+            # Very long lists could exceed the OS argument-length limit
+            result = subprocess.run(
+                ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                cwd=repo_path,
+                input="\0".join(files),
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        else:
             result = subprocess.run(
-                ["git", "add", file],
+                ["git", "add", "--", *files],
                 cwd=repo_path,
                 capture_output=True,
                 text=True,
@@ -66,6 +178,9 @@ def git_commit(message, repo_path="."):
     """
     Commit changes to git repository
     
+    Always runs 'git commit', even when pygit2 is installed: libgit2 does not
+    run pre-commit/commit-msg hooks or honour commit.gpgsign.
+    
     Args:
         message (str): Commit message
         repo_path (str): Path to the repository directory
@@ -83,22 +198,48 @@ def git_commit(message, repo_path="."):
         )
         return f"Committed changes with message: '{message}'"
     except subprocess.CalledProcessError as e:
-        if "nothing to commit" in e.stderr:
+        # git prints "nothing to commit" on stdout
+        if "nothing to commit" in e.stdout or "nothing to commit" in e.stderr:
             return "No changes to commit"
         return f"Error committing to git: {e.stderr}"
     except FileNotFoundError:
         return "Error: Git is not installed or not in PATH"
 
-def git_status(repo_path="."):
+def _porcelain_line(path, flags):
+    """Format a pygit2 status entry like a line of 'git status --porcelain'"""
+    if flags & _UNTRACKED_FLAGS == pygit2.GIT_STATUS_WT_NEW:
+        return f"?? {path}"
+    
+    index_code = next((code for flag, code in _INDEX_STATUS_CODES if flags & flag), " ")
+    worktree_code = next((code for flag, code in _WORKTREE_STATUS_CODES if flags & flag), " ")
+    return f"{index_code}{worktree_code} {path}"
+
+def git_status(repo_path=".", only_check_clean=False):
     """
     Get git repository status
     
     Args:
         repo_path (str): Path to the repository directory
+        only_check_clean (bool): Only report whether tracked files differ from HEAD,
+            skipping the per-file listing (untracked files are not considered)
         
     Returns:
         str: Git status output or error message
     """
+    if only_check_clean:
+        return _git_check_clean(repo_path)
+    
+    repo = _open_repo(repo_path)
+    if repo is not None:
+        try:
+            lines = [_porcelain_line(path, flags) for path, flags in sorted(repo.status().items())
+                     if not flags & pygit2.GIT_STATUS_IGNORED]
+            if lines:
+                return "Git status:\n" + "\n".join(lines) + "\n"
+            return "Working tree clean"
+        except pygit2.GitError as e:
+            return f"Error getting git status: {e}"
+    
     try:
         result = subprocess.run(
             ["git", "status", "--porcelain"],
@@ -118,24 +259,64 @@ def git_status(repo_path="."):
     except FileNotFoundError:
         return "Error: Git is not installed or not in PATH"
 
+def _git_check_clean(repo_path="."):
+    """Report whether tracked files match HEAD without formatting a full status"""
+    repo = _open_repo(repo_path)
+    if repo is not None:
+        try:
+            dirty = any(not flags & pygit2.GIT_STATUS_IGNORED
+                        for flags in repo.status(untracked_files="no").values())
+            return "Working tree has uncommitted changes" if dirty else "Working tree clean"
+        except pygit2.GitError as e:
+            return f"Error getting git status: {e}"
+    
+    try:
+        # 'git diff' refreshes stale index stat data first, unlike plain diff-index
+        result = subprocess.run(
+            ["git", "diff", "--quiet", "HEAD", "--"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode == 0:
+            return "Working tree clean"
+        if result.returncode == 1:
+            return "Working tree has uncommitted changes"
+        
+        # No HEAD to diff against (a repository without commits yet): any
+        # staged file counts as a change, as in the pygit2 path
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            return f"Error getting git status: {result.stderr}"
+        return "Working tree has uncommitted changes" if result.stdout.strip() else "Working tree clean"
+    except FileNotFoundError:
+        return "Error: Git is not installed or not in PATH"
+
 def auto_commit_changes(file_path, commit_message=None, repo_path="."):
     """
-    Automatically add and commit a file
+    Automatically add and commit one or more files
     
     Args:
-        file_path (str): Path to the file to commit
+        file_path (str or list): Path(s) of the file(s) to commit
         commit_message (str, optional): Commit message. If None, auto-generates one.
         repo_path (str): Path to the repository directory
         
     Returns:
         str: Success message or error message
     """
+    files = [file_path] if isinstance(file_path, str) else list(file_path)
+    
     if commit_message is None:
-        filename = Path(file_path).name
-        commit_message = f"AutoGen: Updated {filename}"
+        names = ", ".join(Path(f).name for f in files)
+        commit_message = f"AutoGen: Updated {names}"
     
-    # Add the file
-    add_result = git_add(file_path, repo_path)
+    # Add all files in a single git invocation
+    add_result = git_add(files, repo_path)
     if "Error" in add_result:
         return add_result
     
@@ -143,11 +324,11 @@ def auto_commit_changes(file_path, commit_message=None, repo_path="."):
     commit_result = git_commit(commit_message, repo_path)
     return f"{add_result}\n{commit_result}"
 
-# Function map for integration with the agent
-GIT_FUNCTION_MAP = {
+# Function map for integration with the agent (read-only)
+GIT_FUNCTION_MAP = MappingProxyType({
     "git_init": git_init,
     "git_add": git_add,
     "git_commit": git_commit,
     "git_status": git_status,
     "auto_commit_changes": auto_commit_changes
-}
+})
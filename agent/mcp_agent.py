@@ -3,21 +3,18 @@ AutoGen Coding Agent with MCP-Style Task Execution
 
 This script implements an MCP-like approach for task execution that bypasses
 the function calling issues in AutoGen and directly executes tasks.
+
+Run it from the project root as a module:
+
+    python -m agent.mcp_agent
 """
 
 from dotenv import load_dotenv
-from pathlib import Path
-import sys
 import os
 
-# Add project root to path
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
-
 # Import our modules
 from agent.utils.config import load_config
-from agent.utils.file_ops import read_file, write_file, create_file, apply_code_diff
-from agent.mcp_loader_clean import MCPLoader
+from agent.utils.file_ops import read_file, read_file_head, write_file, create_file, apply_code_diff
 
 # Load environment variables
 load_dotenv()
@@ -31,7 +28,9 @@ def main():
     
     # Load configuration
     config = load_config()
-      # Initialize MCP loader
+    
+    # Initialize MCP loader (imported on use to keep module import cheap)
+    from agent.mcp_loader_clean import MCPLoader
     mcp = MCPLoader(tasks_file="agent/tasks.md", config=config)
     
     # Register available tools
@@ -40,6 +39,7 @@ def main():
     mcp.register_tool("read_file", read_file, "Read content from a file")
     mcp.register_tool("apply_diff", apply_code_diff, "Apply a diff to a file")
     
+    mcp.freeze()
     print("🔧 Registered tools:", list(mcp.tools.keys()))
     
     # Load and parse tasks
@@ -55,22 +55,27 @@ def main():
     
     # Show created files
     print("📁 Files created:")
-    if os.path.exists("project-code"):
-        for file in os.listdir("project-code"):
-            file_path = os.path.join("project-code", file)
-            if os.path.isfile(file_path):
-                size = os.path.getsize(file_path)
-                print(f"   • {file} ({size} bytes)")
+    html_size = None
+    try:
+        with os.scandir("project-code") as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    size = entry.stat(follow_symlinks=False).st_size
+                    print(f"   • {entry.name} ({size} bytes)")
+                    if entry.name == "index.html":
+                        html_size = size
+    except FileNotFoundError:
+        pass
     
     print("\n🎉 Task execution completed!")
     
     # Offer to view the created HTML file
-    if os.path.exists("project-code/index.html"):
+    if html_size is not None:
         print("\n💡 You can view the created HTML file by opening: project-code/index.html")
         
-        # Read and show a preview
-        content = read_file("project-code/index.html")
-        if content and len(content) < 1000:
+        # Show a preview of small files; the size from scandir saves reading large ones
+        if 0 < html_size < 1000:
+            content = read_file_head("project-code/index.html", 1000)
             print("\n📄 HTML Preview:")
             print("-" * 30)
             print(content[:500] + "..." if len(content) > 500 else content)
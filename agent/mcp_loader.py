@@ -5,24 +5,350 @@ This module implements an MCP-like approach for loading tasks and tools,
 then dynamically feeding them into AutoGen agents with full LLM integration.
 """
 
-import yaml
+import asyncio
+import concurrent.futures
+import hashlib
+import io
 import os
-import requests
-import json
 import re
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Callable
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Any, Callable, Mapping, Optional
+
+from agent.utils.jsonio import json_dumps, json_loads
+
+# Patterns for parsing LLM responses, compiled once at import
+_FILENAME_RE = re.compile(r'filename:\s*([^\n]+)', re.IGNORECASE)
+# File names announced in a response ("create a file named x.py", "save as
+# x.py", "filename: x.py", "file: x.py"), matched in one pass
+_FILENAME_MENTION_RE = re.compile(
+    r'(?:create\s+(?:a\s+)?(?:file\s+)?(?:named\s+)?|save\s+(?:this\s+)?(?:as\s+)?|filename:\s*|file:\s*)'
+    r'["`]?(?P<filename>[^\s"`]+\.\w+)["`]?',
+    re.IGNORECASE
+)
+
+# Steps that only name a file to create ("create index.html", "create an app.js")
+_TEMPLATE_STEP_RE = re.compile(r'create\s+(?:an?\s+)?([\w-]+)\.(\w+)', re.IGNORECASE)
+
+# Starter content for such steps, by extension; {name} is the file's base name
+_STATIC_TEMPLATES = {
+    'html': """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{name}</title>
+</head>
+<body>
+    <h1>{name}</h1>
+</body>
+</html>""",
+    'js': '// {name}.js\n\nconsole.log("{name} loaded");\n',
+    'css': '/* {name}.css */\n\nbody {{\n    margin: 0;\n    font-family: sans-serif;\n}}\n',
+}
+
+def _extract_code_blocks(text: str) -> List[tuple]:
+    """
+    Find the fenced code blocks in a markdown text in a single pass
+    
+    Args:
+        text: Text containing ``` fenced blocks
+        
+    Returns:
+        List of (language, code) tuples; language is '' when not given
+    """
+    blocks = []
+    i = 0
+    while True:
+        start = text.find('```', i)
+        if start < 0:
+            break
+        newline = text.find('\n', start + 3)
+        if newline < 0:
+            break
+        # The closing fence starts its own line
+        end = text.find('\n```', newline)
+        if end < 0:
+            break
+        blocks.append((text[start + 3:newline].strip(), text[newline + 1:end]))
+        i = end + 4
+    return blocks
+
+class _CodeStreamWriter:
+    """
+    Write the code from a streamed LLM response to a file as it arrives
+    
+    Mirrors _extract_code_from_llm_response: the content of the first fenced
+    block is written, or the whole response if it has no fence, stripped of
+    surrounding whitespace.
+    
+    With wrap_tag set (e.g. "style"), code that does not already start with
+    that tag is wrapped in it, like the non-streaming styling path does.
+    """
+    
+    def __init__(self, f, wrap_tag: Optional[str] = None):
+        self.f = f
+        self.buffer = ''
+        self.state = 'before'  # 'before' the fence, in the 'code', or 'done'
+        self.started = False
+        self.wrap_tag = wrap_tag
+        # Start of the code, held back until it shows whether to wrap it
+        self.head = '' if wrap_tag else None
+        self.wrapped = False
+        
+    def _write(self, text: str):
+        if not self.started:
+            text = text.lstrip()
+            self.started = bool(text)
+        if not text:
+            return
+        if self.head is not None:
+            self.head += text
+            if len(self.head) <= len(self.wrap_tag):
+                return
+            text = self._open_wrap()
+        self.f.write(text)
+        
+    def _open_wrap(self) -> str:
+        """Write the opening tag if the held-back start needs one and release it"""
+        head, self.head = self.head, None
+        self.wrapped = not head.lower().startswith('<' + self.wrap_tag)
+        if self.wrapped:
+            self.f.write(f"<{self.wrap_tag}>\n")
+        return head
+            
+    def feed(self, chunk: str):
+        if self.state == 'done':
+            return
+        self.buffer += chunk
+        
+        if self.state == 'before':
+            start = self.buffer.find('```')
+            newline = self.buffer.find('\n', start + 3) if start >= 0 else -1
+            if newline < 0:
+                return
+            self.buffer = self.buffer[newline + 1:]
+            self.state = 'code'
+            
+        end = self.buffer.find('\n```')
+        if end >= 0:
+            self._write(self.buffer[:end].rstrip())
+            self.buffer = ''
+            self.state = 'done'
+            return
+            
+        # Hold back a possible partial closing fence and trailing whitespace
+        safe = len(self.buffer[:-3].rstrip())
+        self._write(self.buffer[:safe])
+        self.buffer = self.buffer[safe:]
+        
+    def close(self):
+        if self.state == 'before':
+            # No fence at all: the whole response is the code
+            self._write(self.buffer.strip())
+        elif self.state == 'code':
+            # Unterminated block: keep what arrived
+            self._write(self.buffer.rstrip())
+        self.buffer = ''
+        
+        if self.head:
+            # The whole code was no longer than the tag name
+            self.f.write(self._open_wrap())
+        if self.wrapped:
+            self.f.write(f"\n</{self.wrap_tag}>")
+            self.wrapped = False
+
+def _run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code
+    
+    Uses asyncio.run, or a worker thread with its own event loop when the
+    caller is already inside a running loop (where asyncio.run raises).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+# Contents of inline <style> and <script> tags, left out of styling prompts
+_EMBEDDED_BLOCK_RE = re.compile(r'(<(style|script)\b[^>]*>).*?(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+
+# Opening <html> tag and doctype, where styles go in pages without a </head>
+_HTML_OPEN_RE = re.compile(r'<html\b[^>]*>', re.IGNORECASE)
+_DOCTYPE_RE = re.compile(r'<!doctype\b[^>]*>', re.IGNORECASE)
+
+def _style_insert_offset(html: str) -> int:
+    """Get the offset in html at which to insert a <style> block"""
+    head_end = html.lower().find('</head>')
+    if head_end >= 0:
+        return head_end
+    match = _HTML_OPEN_RE.search(html) or _DOCTYPE_RE.search(html)
+    return match.end() if match else 0
+
+# LLM prompt templates, filled in with str.format
+_BATCH_PROMPT = """
+You are an expert software developer. Create one complete file for each of these requirements:
+
+{step_list}
+
+Requirements:
+- Create complete, production-ready code
+- Follow best practices for each file type
+- Use the given filename where one is provided, otherwise suggest an appropriate one
+
+Reply with ONLY a JSON object in exactly this format, no explanations:
+{{"steps": [{{"id": <requirement number>, "filename": "<filename>", "language": "<language>", "content": "<complete file content>"}}]}}
+"""
+
+_FILE_PROMPT = """
+You are an expert software developer. Create a complete file based on this requirement:
+
+"{step}"
+
+Requirements:
+- Analyze the step to determine what type of file is needed
+- Create complete, production-ready code
+- Follow best practices for the file type
+- Include proper comments and documentation
+- Suggest an appropriate filename
+
+Please provide:
+1. The suggested filename
+2. The complete file content
+
+Format your response as:
+filename: [suggested_filename]
+```[language]
+[complete code content]
+```
+"""
+
+_JAVASCRIPT_PROMPT = """
+You are an expert JavaScript developer. Create a complete JavaScript file based on this requirement:
+
+"{step}"
+
+Requirements:
+- Create modern, clean JavaScript code
+- Follow best practices and ES6+ standards
+- Include proper comments and documentation
+- Ensure code is production-ready
+- Make it compatible with modern browsers
+
+Please provide ONLY the JavaScript code, no explanations or additional text.
+"""
+
+_HTML_PROMPT = """
+You are an expert web developer. Create a complete, modern HTML file based on this requirement:
+
+"{step}"
+
+Requirements:
+- Create a complete, valid HTML5 document
+- Include proper meta tags and document structure
+- Make it visually appealing with modern styling
+- Ensure it's responsive and accessible
+- Include relevant content based on the step description
+
+Please provide ONLY the HTML code, no explanations or additional text.
+"""
+
+_STYLING_PROMPT = """
+You are an expert web developer and designer. I have an existing HTML file and need to add beautiful, modern styling based on this requirement:
+
+"{step}"
+
+Current HTML content (contents of existing <style> and <script> tags omitted):
+{outline}
+
+Requirements:
+- Add modern, responsive CSS styling
+- Make it visually appealing with good design principles
+- Ensure accessibility and usability
+- Use modern CSS features (flexbox, grid, animations if appropriate)
+- Make it mobile-responsive
+- Follow the styling requirement in the step description
+
+Please provide ONLY a complete <style>...</style> block with the new CSS. Do not repeat the HTML, and provide no explanations.
+"""
+
+_GENERAL_STEP_PROMPT = """
+You are an expert software developer. I need help executing this development step:
+
+"{step}"
+
+Context: This is part of a larger software project. Please analyze what needs to be done and provide specific instructions or code to accomplish this step.
+
+If this step requires creating files, modifying code, or implementing functionality, please provide:
+1. A clear explanation of what needs to be done
+2. Any code that should be created or modified
+3. File names and structure if applicable
+
+Focus on practical implementation details.
+"""
+
+# Directory of this module, where the default tasks.md lives
+_THIS_DIR = Path(__file__).parent
+
+# One keep-alive connection pool shared by all LLM calls, created on first use
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+def _get_session():
+    """Get the shared requests session, importing requests on first use"""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+            session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0))
+            _SESSION = session
+    return _SESSION
+
+# Tasks file locations found so far, by (working directory, tasks_file)
+_TASKS_PATH_CACHE = {}
 
 class MCPLoader:
     """
     MCP-style loader that parses tasks.md and dynamically configures agents
     """
     
+    # Directory generated files are written to, and the page styling steps edit
+    OUTPUT_DIR = 'project-code'
+    HTML_FILE = f'{OUTPUT_DIR}/index.html'
+    JS_FILE = f'{OUTPUT_DIR}/script.js'
+    
+    # Step keywords and the handler they select, checked in order
+    _STEP_HANDLERS = (
+        (('html',), '_create_html_file'),
+        (('create', 'file'), '_create_file_with_llm'),
+        (('style', 'css', 'design', 'appearance'), '_add_styling'),
+        (('javascript', 'js', 'script', 'interactive'), '_create_javascript_with_llm'),
+    )
+    
+    # Finds every keyword occurrence, overlapping ones included, in one scan;
+    # the rank is the position of the keyword's handler in _STEP_HANDLERS
+    _STEP_KEYWORD_RE = re.compile(
+        '(?=(' + '|'.join(kw for keywords, _ in _STEP_HANDLERS for kw in keywords) + '))',
+        re.IGNORECASE
+    )
+    _KEYWORD_RANK = {kw: rank for rank, (keywords, _) in enumerate(_STEP_HANDLERS) for kw in keywords}
+    
     def __init__(self, tasks_file: str = "tasks.md", config: Dict = None):
         self.tasks_file = tasks_file
         self.config = config or {}
         self.tasks = []
         self.tools = {}
+        self._tool_functions = None
+        self._tasks_path = None
+        self._tasks_mtime = None
+        self._output_dir_ready = False
+        self._llm_cache = {}
         self.constraints = []
         self.goals = []
         
@@ -33,63 +359,96 @@ class MCPLoader:
             'max_tokens': 2000
         })
         
-    def load_tasks(self) -> List[Dict]:
-        """Load and parse tasks from markdown file"""
+    def _possible_tasks_paths(self):
+        """Candidate locations for the tasks file, in lookup order"""
+        yield Path(self.tasks_file)  # Direct path
         if not os.path.isabs(self.tasks_file):
             # If relative path, check both current directory and agent directory
-            possible_paths = [
-                Path(self.tasks_file),  # Direct relative path
-                Path("agent") / "tasks.md",  # agent/tasks.md
-                Path(__file__).parent / "tasks.md",  # Same directory as this file
-                Path(__file__).parent.parent / "agent" / "tasks.md"  # project_root/agent/tasks.md
-            ]
-            
-            tasks_path = None
-            for path in possible_paths:
-                if path.exists():
-                    tasks_path = path
-                    break
-                    
-            if tasks_path is None:
-                print(f"Tasks file not found in any of these locations:")
-                for path in possible_paths:
-                    print(f"  - {path.absolute()}")
-                return []
-        else:
-            tasks_path = Path(self.tasks_file)
-            
-        print(f"Found tasks file at: {tasks_path.absolute()}")
+            yield Path("agent") / "tasks.md"  # agent/tasks.md
+            yield _THIS_DIR / "tasks.md"  # Same directory as this file
+            yield _THIS_DIR.parent / "agent" / "tasks.md"  # project_root/agent/tasks.md
             
-        if not tasks_path.exists():
-            print(f"Tasks file not found: {tasks_path}")
+    def load_tasks(self) -> List[Dict]:
+        """
+        Load and parse tasks from markdown file
+        
+        The file is only re-read when its modification time changed since
+        the last load.
+        """
+        tasks_path, mtime = self._stat_tasks_file()
+        if tasks_path is None:
+            print(f"Tasks file not found in any of these locations:")
+            for path in self._possible_tasks_paths():
+                print(f"  - {path.absolute()}")
             return []
             
-        with open(tasks_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if mtime == self._tasks_mtime:
+            return self.tasks
             
-        # Parse tasks from markdown
-        self.tasks = self._parse_markdown_tasks(content)
+        # Parse tasks from markdown as the file is read
+        with open(tasks_path, 'r', encoding='utf-8') as f:
+            self.tasks = self._parse_markdown_lines(f)
+        self._tasks_mtime = mtime
         return self.tasks
         
+    def _stat_tasks_file(self) -> tuple:
+        """
+        Find the tasks file and its modification time
+        
+        The location found by an earlier call, in this or another loader,
+        is checked first with a single stat.
+        
+        Returns:
+            (path, mtime_ns), or (None, None) if no candidate exists
+        """
+        key = (os.getcwd(), self.tasks_file)
+        path = self._tasks_path or _TASKS_PATH_CACHE.get(key)
+        if path is not None:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                self._tasks_path = path
+                return path, mtime
+            except OSError:
+                # The file moved; look it up again
+                _TASKS_PATH_CACHE.pop(key, None)
+                self._tasks_path = None
+                self._tasks_mtime = None
+                
+        for path in self._possible_tasks_paths():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            print(f"Found tasks file at: {path.absolute()}")
+            self._tasks_path = path
+            _TASKS_PATH_CACHE[key] = path
+            return path, mtime
+        return None, None
+        
     def _parse_markdown_tasks(self, content: str) -> List[Dict]:
         """Parse tasks from markdown content"""
+        return self._parse_markdown_lines(io.StringIO(content))
+        
+    def _parse_markdown_lines(self, lines: Iterable[str]) -> List[Dict]:
+        """Parse tasks from an iterable of markdown lines, such as an open file"""
         tasks = []
-        lines = content.split('\n')
         current_task = None
+        description = []
         
         for line in lines:
             line = line.strip()
             if line.startswith('## Task'):
                 if current_task:
+                    current_task['description'] = ' '.join(description)
                     tasks.append(current_task)
                     
                 # Extract task name and number
-                task_title = line.replace('## Task', '').strip()
+                task_title = line[len('## Task'):].strip()
                 if ':' in task_title:
                     task_num, task_name = task_title.split(':', 1)
                     task_name = task_name.strip()
                 else:
-                    task_num = task_title.split()[0] if task_title.split() else "1"
+                    task_num = task_title.split()[0] if task_title else "1"
                     task_name = task_title
                     
                 current_task = {
@@ -99,6 +458,7 @@ class MCPLoader:
                     'steps': [],
                     'type': 'general'
                 }
+                description = []
                 
             elif line.startswith('- ') and current_task:
                 # Extract step
@@ -106,16 +466,18 @@ class MCPLoader:
                 current_task['steps'].append(step)
                 
                 # Determine task type based on content
-                if 'html' in step.lower() or 'create' in step.lower():
+                keywords = self._step_keywords(step)
+                if 'html' in keywords or 'create' in keywords:
                     current_task['type'] = 'file_creation'
-                elif 'style' in step.lower() or 'css' in step.lower():
+                elif 'style' in keywords or 'css' in keywords:
                     current_task['type'] = 'file_modification'
                     
             elif line and current_task and not line.startswith('#'):
                 # Add to description
-                current_task['description'] += line + ' '
+                description.append(line)
                 
         if current_task:
+            current_task['description'] = ' '.join(description)
             tasks.append(current_task)
             
         return tasks
@@ -126,30 +488,67 @@ class MCPLoader:
             'function': func,
             'description': description
         }
+        self._tool_functions = None
+        
+    def freeze(self) -> Mapping[str, Callable]:
+        """Resolve tool names to their functions once all tools are registered"""
+        self._tool_functions = MappingProxyType(
+            {name: tool['function'] for name, tool in self.tools.items()}
+        )
+        return self._tool_functions
+        
+    def _get_tool(self, name: str) -> Optional[Callable]:
+        """Get a registered tool function by name, or None"""
+        if self._tool_functions is None:
+            self.freeze()
+        return self._tool_functions.get(name)
         
+    def _ensure_output_dir(self):
+        """Create the output directory on first use"""
+        if not self._output_dir_ready:
+            os.makedirs(self.OUTPUT_DIR, exist_ok=True)
+            self._output_dir_ready = True
+            
     def register_tools_from_module(self, module_functions: Dict[str, Callable]):
         """Register multiple tools from a module"""
         for name, func in module_functions.items():
             self.register_tool(name, func, func.__doc__ or "")
     
+    def _post_chat(self, prompt: str, stream: bool = False):
+        """Send a chat completion request to the LM Studio server"""
+        return _get_session().post(
+            "http://localhost:1234/v1/chat/completions",
+            headers={"Content-Type": "application/json", "Connection": "keep-alive"},
+            data=json_dumps({
+                "model": "default",
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": self.llm_config.get('temperature', 0.2),
+                "max_tokens": self.llm_config.get('max_tokens', 2000),
+                "stream": stream
+            }),
+            # Fail fast if the server is down, but give generation time to finish;
+            # when streaming, the read timeout applies between chunks
+            timeout=(self.llm_config.get('connect_timeout', 3.05), self.llm_config.get('read_timeout', 60)),
+            stream=stream
+        )
+        
     def _call_llm(self, prompt: str) -> str:
-        """Call the configured LLM with the given prompt"""
+        """Call the configured LLM with the given prompt, reusing earlier responses"""
+        use_cache = self.llm_config.get('cache_responses', True)
+        if use_cache:
+            key = self._llm_cache_key(prompt)
+            if key in self._llm_cache:
+                return self._llm_cache[key]
+                
         try:
             if self.llm_config['provider'] == 'lmstudio':
-                response = requests.post(
-                    "http://localhost:1234/v1/chat/completions",
-                    headers={"Content-Type": "application/json"},
-                    json={
-                        "model": "default",
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": self.llm_config.get('temperature', 0.2),
-                        "max_tokens": self.llm_config.get('max_tokens', 2000)
-                    },
-                    timeout=60
-                )
+                response = self._post_chat(prompt)
                 
                 if response.status_code == 200:
-                    return response.json()["choices"][0]["message"]["content"]
+                    content = json_loads(response.content)["choices"][0]["message"]["content"]
+                    if use_cache:
+                        self._llm_cache[key] = content
+                    return content
                 else:
                     print(f"LLM API error: {response.status_code}")
                     return None
@@ -160,46 +559,173 @@ class MCPLoader:
             print(f"Error calling LLM: {str(e)}")
             return None
     
+    def _llm_cache_key(self, prompt: str) -> str:
+        """Key of a prompt in the response cache; the sampling settings are part of it"""
+        digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{digest}:{self.llm_config.get('temperature', 0.2)}:{self.llm_config.get('max_tokens', 2000)}"
+        
+    def clear_cache(self):
+        """Forget all cached LLM responses"""
+        self._llm_cache.clear()
+    
+    def _stream_code_to_file(self, prompt: str, filepath: str, prefix: str = '', suffix: str = '',
+                             wrap_tag: Optional[str] = None) -> bool:
+        """
+        Stream an LLM response and write its code to a file as it arrives
+        
+        The code goes to a temporary file that replaces filepath only once
+        the response is complete, so a failed request leaves it untouched.
+        
+        Args:
+            prompt: Prompt to send
+            filepath: File to write the extracted code to
+            prefix: Text written before the code
+            suffix: Text written after the code
+            wrap_tag: Tag to wrap the code in unless it already starts with it
+            
+        Returns:
+            True if the file was written, False if the request failed
+        """
+        if self.llm_config['provider'] != 'lmstudio':
+            print(f"Unsupported LLM provider: {self.llm_config['provider']}")
+            return False
+            
+        part_path = filepath + '.part'
+        try:
+            with self._post_chat(prompt, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"LLM API error: {response.status_code}")
+                    return False
+                    
+                received = False
+                with open(part_path, 'w', encoding='utf-8') as f:
+                    f.write(prefix)
+                    writer = _CodeStreamWriter(f, wrap_tag)
+                    # Server-sent events: one "data: {json}" line per delta
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith('data: '):
+                            continue
+                        data = line[len('data: '):]
+                        if data == '[DONE]':
+                            break
+                        content = json_loads(data)["choices"][0].get("delta", {}).get("content")
+                        if content:
+                            received = True
+                            writer.feed(content)
+                    writer.close()
+                    f.write(suffix)
+                    
+            if not received:
+                os.remove(part_path)
+                return False
+            os.replace(part_path, filepath)
+            return True
+        except Exception as e:
+            print(f"Error calling LLM: {str(e)}")
+            try:
+                os.remove(part_path)
+            except FileNotFoundError:
+                pass
+            return False
+    
     def _extract_code_from_llm_response(self, response: str) -> str:
         """Extract code content from LLM response"""
         # Look for code blocks
-        code_block_pattern = r'```(?:\w+)?\n(.*?)\n```'
-        matches = re.findall(code_block_pattern, response, re.DOTALL)
+        blocks = _extract_code_blocks(response)
         
-        if matches:
-            return matches[0].strip()
+        if blocks:
+            return blocks[0][1].strip()
         
         # If no code blocks found, return the response as-is (might be plain code)
         return response.strip()
             
     def execute_task(self, task: Dict) -> Dict:
         """Execute a single task using available tools and LLM reasoning"""
+        return _run_sync(self._execute_task_async(task))
+        
+    def _dispatch_step(self, step: str) -> Callable[[str], str]:
+        """Pick the handler for a step based on its keywords"""
+        if self.llm_config.get('static_templates', True) and self._match_template_step(step):
+            return self._create_from_template
+            
+        best = len(self._STEP_HANDLERS)
+        for match in self._STEP_KEYWORD_RE.finditer(step):
+            best = min(best, self._KEYWORD_RANK[match.group(1).lower()])
+            if best == 0:
+                break
+        if best == len(self._STEP_HANDLERS):
+            return self._execute_general_step
+        return getattr(self, self._STEP_HANDLERS[best][1])
+        
+    def _step_keywords(self, step: str) -> set:
+        """Lowercase handler keywords that occur anywhere in a step"""
+        return {match.group(1).lower() for match in self._STEP_KEYWORD_RE.finditer(step)}
+            
+    def _step_output(self, handler: Callable[[str], str]) -> Optional[str]:
+        """The file a step handler always writes, or None if the LLM picks it"""
+        if handler == self._create_html_file:
+            return self.HTML_FILE
+        if handler == self._create_javascript_with_llm:
+            return self.JS_FILE
+        return None
+            
+    async def _execute_task_async(self, task: Dict) -> Dict:
+        """
+        Execute a task's steps, overlapping steps that write distinct known files
+        
+        Only the HTML and JavaScript steps write fixed paths, so only they
+        run concurrently, and never with another step writing the same file.
+        Every other step (styling, which reads the page, and steps whose
+        file names come from the LLM) waits for the steps before it, and
+        the steps after it wait for it, keeping step-order results.
+        """
         print(f"\n🎯 Executing Task {task['id']}: {task['name']}")
         print(f"Description: {task['description']}")
         
-        results = []
+        # Optionally generate all file steps with one LLM request
+        batched = {}
+        if self.llm_config.get('batch_steps', False):
+            batched = await asyncio.to_thread(self._execute_task_batched, task)
         
-        for i, step in enumerate(task['steps'], 1):
-            print(f"\n📋 Step {i}: {step}")
-            
-            # Use LLM to determine the best approach for each step
-            if any(keyword in step.lower() for keyword in ['create', 'html', 'file']):
-                if 'html' in step.lower():
-                    result = self._create_html_file(step)
-                else:
-                    result = self._create_file_with_llm(step)
-            elif any(keyword in step.lower() for keyword in ['style', 'css', 'design', 'appearance']):
-                result = self._add_styling(step)
-            elif any(keyword in step.lower() for keyword in ['javascript', 'js', 'script', 'interactive']):
-                result = self._create_javascript_with_llm(step)
-            else:
-                result = self._execute_general_step(step)
+        # Bound the number of requests in flight at the LLM server
+        semaphore = asyncio.Semaphore(self.llm_config.get('max_concurrent_requests', 4))
+        
+        async def run_step(i, step, handler):
+            async with semaphore:
+                print(f"\n📋 Step {i + 1}: {step}")
+                return await asyncio.to_thread(handler, step)
                 
-            results.append({
-                'step': step,
-                'result': result,
-                'success': 'error' not in result.lower()
-            })
+        step_results = [None] * len(task['steps'])
+        pending = {}
+        pending_outputs = set()
+        
+        async def flush():
+            for i, result in zip(pending, await asyncio.gather(*pending.values())):
+                step_results[i] = result
+            pending.clear()
+            pending_outputs.clear()
+            
+        for i, step in enumerate(task['steps']):
+            if i in batched:
+                step_results[i] = batched[i]
+                continue
+            handler = self._dispatch_step(step)
+            output = self._step_output(handler)
+            if output is None:
+                await flush()
+                step_results[i] = await run_step(i, step, handler)
+                continue
+            if output in pending_outputs:
+                await flush()
+            pending[i] = run_step(i, step, handler)
+            pending_outputs.add(output)
+        await flush()
+        
+        results = [{
+            'step': step,
+            'result': result,
+            'success': 'error' not in result.lower()
+        } for step, result in zip(task['steps'], step_results)]
             
         return {
             'task_id': task['id'],
@@ -209,33 +735,124 @@ class MCPLoader:
             'overall_success': all(r['success'] for r in results)
         }
     
+    def _execute_task_batched(self, task: Dict) -> Dict[int, str]:
+        """
+        Generate the file-creation steps of a task with a single LLM request
+        
+        Only file steps before the first styling step are batched, since
+        styling depends on the HTML they produce. Steps the reply does not
+        cover are left to the per-step path.
+        
+        Args:
+            task: Task whose steps to batch
+            
+        Returns:
+            Mapping of step index to result message; empty if batching failed
+        """
+        file_handlers = {
+            self._create_html_file: "index.html",
+            self._create_javascript_with_llm: "script.js",
+            self._create_file_with_llm: None,
+        }
+        steps = {}
+        for i, step in enumerate(task['steps']):
+            handler = self._dispatch_step(step)
+            if handler == self._add_styling:
+                break
+            if handler in file_handlers:
+                steps[i] = (step, file_handlers[handler])
+                
+        # A single step gains nothing from the batch format
+        if len(steps) < 2:
+            return {}
+            
+        print(f"🤖 Using LLM to generate {len(steps)} files for task {task['id']} in one request")
+        
+        step_lines = []
+        for i, (step, filename) in steps.items():
+            hint = f" (filename: {filename})" if filename else ""
+            step_lines.append(f'{i + 1}. "{step}"{hint}')
+        step_list = "\n".join(step_lines)
+        
+        prompt = _BATCH_PROMPT.format(step_list=step_list)
+        
+        llm_response = self._call_llm(prompt)
+        if not llm_response:
+            return {}
+            
+        try:
+            entries = json_loads(self._extract_code_from_llm_response(llm_response))['steps']
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Warning: Could not parse batched LLM response, falling back to per-step requests: {e}")
+            return {}
+            
+        results = {}
+        for entry in entries:
+            try:
+                i = int(entry['id']) - 1
+                filename = os.path.basename(str(entry['filename']))
+                content = entry['content']
+            except (KeyError, TypeError, ValueError):
+                continue
+            if i not in steps or i in results or not filename or not isinstance(content, str):
+                continue
+                
+            filepath = f'{self.OUTPUT_DIR}/{filename}'
+            create_file = self._get_tool('create_file')
+            if create_file is not None:
+                result = create_file(filepath, content)
+            else:
+                # Fallback to direct file creation
+                try:
+                    self._ensure_output_dir()
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        f.write(content)
+                    result = f"Successfully created {filepath} with LLM-generated content"
+                except Exception as e:
+                    result = f"Error creating file: {e}"
+                    
+            print(f"✅ {result}")
+            results[i] = result
+            
+        return results
+    
+    def _match_template_step(self, step: str) -> Optional[tuple]:
+        """Return (name, extension) if the step only asks to create a templated file"""
+        match = _TEMPLATE_STEP_RE.fullmatch(step.strip().rstrip('.'))
+        if match and match.group(2).lower() in _STATIC_TEMPLATES:
+            return match.group(1), match.group(2).lower()
+        return None
+        
+    def _create_from_template(self, step: str) -> str:
+        """Create a file named by the step from a bundled template, without the LLM"""
+        name, ext = self._match_template_step(step)
+        filepath = f'{self.OUTPUT_DIR}/{name}.{ext}'
+        content = _STATIC_TEMPLATES[ext].format(name=name)
+        print(f"📄 Using the {ext} template for: {step}")
+        
+        # Use the file creation tool
+        create_file = self._get_tool('create_file')
+        if create_file is not None:
+            result = create_file(filepath, content)
+        else:
+            # Fallback to direct file creation
+            try:
+                self._ensure_output_dir()
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                result = f"Successfully created {filepath} from template"
+            except Exception as e:
+                result = f"Error creating file: {e}"
+                
+        print(f"✅ {result}")
+        return result
+    
     def _create_file_with_llm(self, step: str) -> str:
         """Create any type of file based on the step description using LLM"""
         print(f"🤖 Using LLM to generate file content for: {step}")
         
         # Create a detailed prompt for the LLM
-        prompt = f"""
-You are an expert software developer. Create a complete file based on this requirement:
-
-"{step}"
-
-Requirements:
-- Analyze the step to determine what type of file is needed
-- Create complete, production-ready code
-- Follow best practices for the file type
-- Include proper comments and documentation
-- Suggest an appropriate filename
-
-Please provide:
-1. The suggested filename
-2. The complete file content
-
-Format your response as:
-filename: [suggested_filename]
-```[language]
-[complete code content]
-```
-"""
+        prompt = _FILE_PROMPT.format(step=step)
         
         # Get file content from LLM
         llm_response = self._call_llm(prompt)
@@ -244,20 +861,21 @@ filename: [suggested_filename]
             return "Error: Failed to generate file content with LLM"
         
         # Extract filename and content
-        filename_match = re.search(r'filename:\s*([^\n]+)', llm_response, re.IGNORECASE)
+        filename_match = _FILENAME_RE.search(llm_response)
         filename = filename_match.group(1).strip() if filename_match else "generated_file.txt"
         
         # Extract code content
         file_content = self._extract_code_from_llm_response(llm_response)
         
         # Use the file creation tool
-        filepath = f'project-code/{filename}'
-        if 'create_file' in self.tools:
-            result = self.tools['create_file']['function'](filepath, file_content)
+        filepath = f'{self.OUTPUT_DIR}/{filename}'
+        create_file = self._get_tool('create_file')
+        if create_file is not None:
+            result = create_file(filepath, file_content)
         else:
             # Fallback to direct file creation
             try:
-                os.makedirs('project-code', exist_ok=True)
+                self._ensure_output_dir()
                 with open(filepath, 'w', encoding='utf-8') as f:
                     f.write(file_content)
                 result = f"Successfully created {filepath} with LLM-generated content"
@@ -272,20 +890,7 @@ filename: [suggested_filename]
         print(f"🤖 Using LLM to generate JavaScript content for: {step}")
         
         # Create a detailed prompt for the LLM
-        prompt = f"""
-You are an expert JavaScript developer. Create a complete JavaScript file based on this requirement:
-
-"{step}"
-
-Requirements:
-- Create modern, clean JavaScript code
-- Follow best practices and ES6+ standards
-- Include proper comments and documentation
-- Ensure code is production-ready
-- Make it compatible with modern browsers
-
-Please provide ONLY the JavaScript code, no explanations or additional text.
-"""
+        prompt = _JAVASCRIPT_PROMPT.format(step=step)
         
         # Get JavaScript content from LLM
         js_content = self._call_llm(prompt)
@@ -297,13 +902,14 @@ Please provide ONLY the JavaScript code, no explanations or additional text.
         js_content = self._extract_code_from_llm_response(js_content)
         
         # Use the file creation tool
-        filepath = 'project-code/script.js'
-        if 'create_file' in self.tools:
-            result = self.tools['create_file']['function'](filepath, js_content)
+        filepath = self.JS_FILE
+        create_file = self._get_tool('create_file')
+        if create_file is not None:
+            result = create_file(filepath, js_content)
         else:
             # Fallback to direct file creation
             try:
-                os.makedirs('project-code', exist_ok=True)
+                self._ensure_output_dir()
                 with open(filepath, 'w', encoding='utf-8') as f:
                     f.write(js_content)
                 result = f"Successfully created {filepath} with LLM-generated content"
@@ -318,20 +924,7 @@ Please provide ONLY the JavaScript code, no explanations or additional text.
         print(f"🤖 Using LLM to generate HTML content for: {step}")
         
         # Create a detailed prompt for the LLM
-        prompt = f"""
-You are an expert web developer. Create a complete, modern HTML file based on this requirement:
-
-"{step}"
-
-Requirements:
-- Create a complete, valid HTML5 document
-- Include proper meta tags and document structure
-- Make it visually appealing with modern styling
-- Ensure it's responsive and accessible
-- Include relevant content based on the step description
-
-Please provide ONLY the HTML code, no explanations or additional text.
-"""
+        prompt = _HTML_PROMPT.format(step=step)
         
         # Get HTML content from LLM
         html_content = self._call_llm(prompt)
@@ -343,15 +936,16 @@ Please provide ONLY the HTML code, no explanations or additional text.
         html_content = self._extract_code_from_llm_response(html_content)
         
         # Use the file creation tool
-        if 'create_file' in self.tools:
-            result = self.tools['create_file']['function']('project-code/index.html', html_content)
+        create_file = self._get_tool('create_file')
+        if create_file is not None:
+            result = create_file(self.HTML_FILE, html_content)
         else:
             # Fallback to direct file creation
             try:
-                os.makedirs('project-code', exist_ok=True)
-                with open('project-code/index.html', 'w', encoding='utf-8') as f:
+                self._ensure_output_dir()
+                with open(self.HTML_FILE, 'w', encoding='utf-8') as f:
                     f.write(html_content)
-                result = "Successfully created project-code/index.html with LLM-generated content"
+                result = f"Successfully created {self.HTML_FILE} with LLM-generated content"
             except Exception as e:
                 result = f"Error creating HTML file: {e}"
                 
@@ -359,54 +953,63 @@ Please provide ONLY the HTML code, no explanations or additional text.
         return result
         
     def _add_styling(self, step: str) -> str:
-        """Add styling to the HTML file using LLM"""
-        html_file = 'project-code/index.html'
+        """
+        Add styling to the HTML file using LLM
+        
+        The LLM only writes a <style> block, which is inserted before
+        </head> (or after the <html> tag or doctype if the page has no
+        head, so a doctype stays first). Existing <style>
+        and <script> contents are left out of the prompt.
+        """
+        html_file = self.HTML_FILE
         
-        if not os.path.exists(html_file):
-            return "Error: HTML file not found. Create it first."
-            
         try:
-            # Read current file
+            # Read current file; opening it is also the existence check
             with open(html_file, 'r', encoding='utf-8') as f:
                 current_content = f.read()
             
             print(f"🤖 Using LLM to generate CSS styling for: {step}")
             
+            # The existing CSS and scripts are not needed to write new rules
+            outline = _EMBEDDED_BLOCK_RE.sub(r'\1...\3', current_content)
+            
             # Create a detailed prompt for the LLM
-            prompt = f"""
-You are an expert web developer and designer. I have an existing HTML file and need to add beautiful, modern styling based on this requirement:
-
-"{step}"
-
-Current HTML content:
-{current_content}
-
-Requirements:
-- Add modern, responsive CSS styling
-- Make it visually appealing with good design principles
-- Ensure accessibility and usability
-- Use modern CSS features (flexbox, grid, animations if appropriate)
-- Make it mobile-responsive
-- Follow the styling requirement in the step description
-
-Please provide the COMPLETE updated HTML file with the CSS styling included (either in <style> tags or as a separate CSS file if you also provide that). Provide ONLY the code, no explanations.
-"""
+            prompt = _STYLING_PROMPT.format(outline=outline, step=step)
+            
+            insert_at = _style_insert_offset(current_content)
+            before, after = current_content[:insert_at], current_content[insert_at:]
+            
+            # Write the styled file while the response streams in
+            if self.llm_config.get('stream', False):
+                if not self._stream_code_to_file(prompt, html_file, prefix=before, suffix='\n' + after,
+                                                 wrap_tag='style'):
+                    return "Error: Failed to generate styled content with LLM"
+                result = "Successfully added LLM-generated styling to index.html"
+                print(f"✅ {result}")
+                return result
             
             # Get styled content from LLM
-            styled_content = self._call_llm(prompt)
+            style_block = self._call_llm(prompt)
             
-            if not styled_content:
+            if not style_block:
                 return "Error: Failed to generate styled content with LLM"
             
             # Extract code if it's wrapped in code blocks
-            styled_content = self._extract_code_from_llm_response(styled_content)
+            style_block = self._extract_code_from_llm_response(style_block)
+            if not style_block.lower().startswith('<style'):
+                style_block = f"<style>\n{style_block}\n</style>"
             
-            # Write the updated content back to the file
+            # Write the page back with the style block spliced in
             with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(styled_content)
+                f.write(before)
+                f.write(style_block)
+                f.write('\n')
+                f.write(after)
                 
             result = "Successfully added LLM-generated styling to index.html"
             
+        except FileNotFoundError:
+            return "Error: HTML file not found. Create it first."
         except Exception as e:
             result = f"Error adding styling: {e}"
             
@@ -418,20 +1021,7 @@ Please provide the COMPLETE updated HTML file with the CSS styling included (eit
         print(f"🤖 Using LLM to execute general step: {step}")
         
         # Create a detailed prompt for the LLM
-        prompt = f"""
-You are an expert software developer. I need help executing this development step:
-
-"{step}"
-
-Context: This is part of a larger software project. Please analyze what needs to be done and provide specific instructions or code to accomplish this step.
-
-If this step requires creating files, modifying code, or implementing functionality, please provide:
-1. A clear explanation of what needs to be done
-2. Any code that should be created or modified
-3. File names and structure if applicable
-
-Focus on practical implementation details.
-"""
+        prompt = _GENERAL_STEP_PROMPT.format(step=step)
         
         # Get instructions from LLM
         llm_response = self._call_llm(prompt)
@@ -454,52 +1044,37 @@ Focus on practical implementation details.
     def _process_llm_file_instructions(self, llm_response: str, step: str):
         """Process LLM response to extract and create any files mentioned"""
         # Extract code blocks
-        code_blocks = re.findall(r'```(\w+)?\n(.*?)\n```', llm_response, re.DOTALL)
-        
-        # Look for file names in the response
-        filename_patterns = [
-            r'create\s+(?:a\s+)?(?:file\s+)?(?:named\s+)?["`]?([^\s"`]+\.\w+)["`]?',
-            r'save\s+(?:this\s+)?(?:as\s+)?["`]?([^\s"`]+\.\w+)["`]?',
-            r'filename:\s*["`]?([^\s"`]+\.\w+)["`]?',
-            r'file:\s*["`]?([^\s"`]+\.\w+)["`]?'
-        ]
+        code_blocks = _extract_code_blocks(llm_response)
         
-        filenames = []
-        for pattern in filename_patterns:
-            matches = re.findall(pattern, llm_response, re.IGNORECASE)
-            filenames.extend(matches)
+        # Look for file names in the response, in the order they appear
+        filenames = [match.group('filename') for match in _FILENAME_MENTION_RE.finditer(llm_response)]
         
-        # Create files if we found both code blocks and filenames
-        if code_blocks and filenames:
-            os.makedirs('project-code', exist_ok=True)
+        # Pair code blocks with file names in order; extras of either are ignored
+        files = [(os.path.join(self.OUTPUT_DIR, filename), code.strip())
+                 for filename, (lang, code) in zip(filenames, code_blocks)]
+        if files:
+            self._ensure_output_dir()
             
-            for i, (lang, code) in enumerate(code_blocks):
-                if i < len(filenames):
-                    filename = filenames[i]
-                    filepath = os.path.join('project-code', filename)
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(code.strip())
-                    
-                    print(f"📁 Created file: {filepath}")
-                elif len(code_blocks) == 1 and len(filenames) >= 1:
-                    # If there's one code block and one or more filenames, use the first filename
-                    filename = filenames[0]
-                    filepath = os.path.join('project-code', filename)
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(code.strip())
-                    
-                    print(f"📁 Created file: {filepath}")
+        for filepath, code in files:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(code)
+                
+            print(f"📁 Created file: {filepath}")
         
     def run_all_tasks(self) -> List[Dict]:
         """Run all loaded tasks"""
         if not self.tasks:
             self.load_tasks()
+        self.freeze()
             
+        return _run_sync(self._run_all_async())
+        
+    async def _run_all_async(self) -> List[Dict]:
+        """Run the loaded tasks in order within one event loop"""
+        # Later tasks build on files written by earlier ones, so tasks stay sequential
         results = []
         for task in self.tasks:
-            result = self.execute_task(task)
+            result = await self._execute_task_async(task)
             results.append(result)
             
         return results
@@ -509,13 +1084,15 @@ Focus on practical implementation details.
         total_tasks = len(results)
         successful_tasks = sum(1 for r in results if r['overall_success'])
         
-        summary = f"\n🎉 Task Execution Summary:\n"
-        summary += f"   Total tasks: {total_tasks}\n"
-        summary += f"   Successful: {successful_tasks}\n"
-        summary += f"   Failed: {total_tasks - successful_tasks}\n\n"
+        parts = [
+            f"\n🎉 Task Execution Summary:\n",
+            f"   Total tasks: {total_tasks}\n",
+            f"   Successful: {successful_tasks}\n",
+            f"   Failed: {total_tasks - successful_tasks}\n\n"
+        ]
         
         for result in results:
             status = "✅" if result['overall_success'] else "❌"
-            summary += f"{status} Task {result['task_id']}: {result['task_name']}\n"
+            parts.append(f"{status} Task {result['task_id']}: {result['task_name']}\n")
             
-        return summary
+        return ''.join(parts)
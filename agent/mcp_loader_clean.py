@@ -8,11 +8,132 @@ The MCP (Model Context Protocol) loader is responsible for:
 4. Managing tools and capabilities for the agents
 """
 
-import yaml
+import mmap
 import os
+import re
 from pathlib import Path
+from types import MappingProxyType
 import json
-from typing import Dict, List, Any, Optional, Union, Callable
+from typing import Dict, List, Any, Optional, Union, Callable, Mapping
+
+# "## Task ..." headings and "- ..." steps, each on its own line (matched on bytes)
+_TASK_LINE_RE = re.compile(rb'^[^\S\n]*(?:## Task(.*)|- (.*\S))[^\S\n]*$', re.MULTILINE)
+
+# Keywords that decide how a step is handled; the lookahead also reports
+# occurrences that overlap another keyword
+_STEP_KEYWORD_RE = re.compile(r'(?=(html|create|style|css))', re.IGNORECASE)
+
+def _step_keywords(step: str) -> set:
+    """Lowercase keywords that occur anywhere in a step"""
+    return {match.group(1).lower() for match in _STEP_KEYWORD_RE.finditer(step)}
+
+def _step_action(step: str) -> Optional[str]:
+    """'html' for steps that create the page, 'style' for styling steps, else None"""
+    keywords = _step_keywords(step)
+    if 'create' in keywords and 'html' in keywords:
+        return 'html'
+    if 'style' in keywords or 'css' in keywords:
+        return 'style'
+    return None
+
+# Pages written by HTML steps: the "hello agentic world" page and a generic one
+_HELLO_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Hello Agentic World</title>
+</head>
+<body>
+    <h1>Hello Agentic World</h1>
+    <p>Welcome to the world of AI agents!</p>
+</body>
+</html>'''
+
+_DEFAULT_HTML = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Generated Page</title>
+</head>
+<body>
+    <h1>Generated Content</h1>
+</body>
+</html>'''
+
+# Styles inserted before </head> by styling steps (UTF-8 bytes, spliced into the raw file)
+_CSS_BLOCK = b'''
+    <style>
+        body {
+            font-family: 'Arial', sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            margin: 0;
+            padding: 0;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            min-height: 100vh;
+            color: white;
+        }
+        
+        h1 {
+            font-size: 3rem;
+            text-align: center;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+            margin-bottom: 1rem;
+            animation: fadeIn 2s ease-in;
+        }
+        
+        p {
+            font-size: 1.2rem;
+            text-align: center;
+            opacity: 0.9;
+        }
+        
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(-20px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
+        
+        .container {
+            text-align: center;
+            padding: 2rem;
+            background: rgba(255,255,255,0.1);
+            border-radius: 15px;
+            backdrop-filter: blur(10px);
+            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+        }
+    </style>'''
+
+def _style_html(content: bytes) -> bytes:
+    """Insert the styles before </head> and wrap the body content in a container"""
+    content = content.replace(b'</head>', _CSS_BLOCK + b'\n</head>', 1)
+    
+    body_start = content.find(b'<body>')
+    body_end = content.rfind(b'</body>')
+    if body_start >= 0 and body_end > body_start:
+        body_start += len(b'<body>')
+        body_content = content[body_start:body_end].strip()
+        content = b''.join((
+            content[:body_start],
+            b'\n    <div class="container">\n        ',
+            body_content,
+            b'\n    </div>\n',
+            content[body_end:]
+        ))
+    return content
+
+# Each page as it looks after a styling step, for HTML steps directly followed by one
+_STYLED_PAGES = {
+    page: _style_html(page.encode('utf-8')).decode('utf-8')
+    for page in (_HELLO_HTML, _DEFAULT_HTML)
+}
+
+_STYLING_RESULT = "Successfully added beautiful styling to index.html"
+
+# Tasks file locations found so far, by (working directory, tasks_file)
+_TASKS_PATH_CACHE = {}
 
 class MCPLoader:
     """
@@ -24,79 +145,121 @@ class MCPLoader:
         self.config = config or {}
         self.tasks = []
         self.tools = {}
+        self._tool_functions = None
+        self._tasks_path = None
+        self._tasks_mtime = None
+        
+    def _possible_tasks_paths(self):
+        """Candidate locations for the tasks file, in lookup order"""
+        yield Path(self.tasks_file)  # Direct path
+        yield Path("agent") / "tasks.md"  # agent/tasks.md
+        yield Path(__file__).parent / "tasks.md"  # Same directory as this file
         
     def load_tasks(self) -> List[Dict]:
-        """Load and parse tasks from markdown file"""
-        # Try to find the tasks file in various locations
-        possible_paths = [
-            Path(self.tasks_file),  # Direct path
-            Path("agent") / "tasks.md",  # agent/tasks.md
-            Path(__file__).parent / "tasks.md",  # Same directory as this file
-        ]
+        """
+        Load and parse tasks from markdown file
         
-        tasks_path = None
-        for path in possible_paths:
-            if path.exists():
-                tasks_path = path
-                break
-                
+        The file is only re-read when its modification time changed since
+        the last load.
+        """
+        tasks_path, mtime = self._stat_tasks_file()
         if tasks_path is None:
             print(f"Tasks file not found in any of these locations:")
-            for path in possible_paths:
+            for path in self._possible_tasks_paths():
                 print(f"  - {path.absolute()}")
             return []
             
-        print(f"Found tasks file at: {tasks_path.absolute()}")
-        
-        with open(tasks_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if mtime == self._tasks_mtime:
+            return self.tasks
             
-        # Parse tasks from markdown
-        self.tasks = self._parse_markdown_tasks(content)
+        # Parse tasks from markdown, scanning the mapped file without copying it
+        with open(tasks_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                self.tasks = []
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    self.tasks = self._parse_markdown_bytes(content)
+        self._tasks_mtime = mtime
         return self.tasks
         
+    def _stat_tasks_file(self) -> tuple:
+        """
+        Find the tasks file and its modification time
+        
+        The location found by an earlier call, in this or another loader,
+        is checked first with a single stat.
+        
+        Returns:
+            (path, mtime_ns), or (None, None) if no candidate exists
+        """
+        key = (os.getcwd(), self.tasks_file)
+        path = self._tasks_path or _TASKS_PATH_CACHE.get(key)
+        if path is not None:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                self._tasks_path = path
+                return path, mtime
+            except OSError:
+                # The file moved; look it up again
+                _TASKS_PATH_CACHE.pop(key, None)
+                self._tasks_path = None
+                self._tasks_mtime = None
+                
+        for path in self._possible_tasks_paths():
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            print(f"Found tasks file at: {path.absolute()}")
+            self._tasks_path = path
+            _TASKS_PATH_CACHE[key] = path
+            return path, mtime
+        return None, None
+        
     def _parse_markdown_tasks(self, content: str) -> List[Dict]:
         """Parse tasks from markdown content"""
-        tasks = []
-        lines = content.split('\n')
-        current_task = None
+        return self._parse_markdown_bytes(content.encode('utf-8'))
         
-        for line in lines:
-            line = line.strip()
-            if line.startswith('## Task'):
-                if current_task:
-                    tasks.append(current_task)
-                    
-                # Extract task name and number
-                task_title = line.replace('## Task', '').strip()
-                if ':' in task_title:
-                    task_num, task_name = task_title.split(':', 1)
-                    task_name = task_name.strip()
-                else:
-                    task_num = task_title.split()[0] if task_title.split() else "1"
-                    task_name = task_title
-                    
-                current_task = {
-                    'id': task_num.strip(),
-                    'name': task_name,
-                    'description': '',
-                    'steps': [],
-                    'type': 'general'
-                }
-                
-            elif line.startswith('- ') and current_task:
-                # Extract step
-                step = line[2:].strip()
-                current_task['steps'].append(step)
+    def _parse_markdown_bytes(self, content) -> List[Dict]:
+        """Parse tasks from UTF-8 markdown in a bytes-like object, such as a mapped file"""
+        # Only task headings and steps matter; the regex skips all other lines.
+        # A heading's step group is empty, and a step's never is.
+        lines = _TASK_LINE_RE.findall(content)
+        headings = [i for i, (_, step) in enumerate(lines) if not step]
+        headings.append(len(lines))
+        
+        tasks = []
+        for start, end in zip(headings, headings[1:]):
+            # Extract task name and number; only the matched parts are decoded
+            task_title = lines[start][0].decode('utf-8').strip()
+            if ':' in task_title:
+                task_num, task_name = task_title.split(':', 1)
+                task_name = task_name.strip()
+            else:
+                task_num = task_title.split()[0] if task_title else "1"
+                task_name = task_title
                 
-                # Determine task type based on content
-                if 'html' in step.lower() or 'create' in step.lower():
-                    current_task['type'] = 'file_creation'
-                elif 'style' in step.lower() or 'css' in step.lower():
-                    current_task['type'] = 'file_modification'
+            # Every line up to the next heading is a step of this task
+            steps = [step.decode('utf-8').strip() for _, step in lines[start + 1:end]]
+            
+            # The task type comes from the last step that mentions a type keyword
+            task_type = 'general'
+            for step in reversed(steps):
+                keywords = _step_keywords(step)
+                if 'html' in keywords or 'create' in keywords:
+                    task_type = 'file_creation'
+                    break
+                if 'style' in keywords or 'css' in keywords:
+                    task_type = 'file_modification'
+                    break
                     
-        if current_task:
-            tasks.append(current_task)
+            tasks.append({
+                'id': task_num.strip(),
+                'name': task_name,
+                'description': '',
+                'steps': steps,
+                'type': task_type
+            })
             
         return tasks
         
@@ -106,6 +269,20 @@ class MCPLoader:
             'function': func,
             'description': description
         }
+        self._tool_functions = None
+        
+    def freeze(self) -> Mapping[str, Callable]:
+        """Resolve tool names to their functions once all tools are registered"""
+        self._tool_functions = MappingProxyType(
+            {name: tool['function'] for name, tool in self.tools.items()}
+        )
+        return self._tool_functions
+        
+    def _get_tool(self, name: str) -> Optional[Callable]:
+        """Get a registered tool function by name, or None"""
+        if self._tool_functions is None:
+            self.freeze()
+        return self._tool_functions.get(name)
         
     def execute_task(self, task: Dict) -> Dict:
         """Execute a single task using available tools"""
@@ -113,14 +290,28 @@ class MCPLoader:
         print(f"Description: {task['description']}")
         
         results = []
+        steps = task['steps']
+        actions = [_step_action(step) for step in steps]
+        pre_styled = False
         
-        for i, step in enumerate(task['steps'], 1):
+        for i, step in enumerate(steps, 1):
             print(f"\n📋 Step {i}: {step}")
             
             # Determine which tool to use based on step content
-            if 'create' in step.lower() and 'html' in step.lower():
-                result = self._create_html_file(step)
-            elif 'style' in step.lower() or 'css' in step.lower():
+            action = actions[i - 1]
+            if action == 'html':
+                # A styling step right after this one would only restyle the
+                # page written here, so write the styled page directly
+                styled = i < len(steps) and actions[i] == 'style'
+                result = self._create_html_file(step, styled=styled)
+                # Only skip the styling step if the styled page was written;
+                # create_file refuses to overwrite an existing page
+                pre_styled = styled and result.startswith("Successfully created")
+            elif action == 'style' and pre_styled:
+                pre_styled = False
+                result = _STYLING_RESULT
+                print(f"✅ {result}")
+            elif action == 'style':
                 result = self._add_styling(step)
             else:
                 result = self._execute_general_step(step)
@@ -139,38 +330,20 @@ class MCPLoader:
             'overall_success': all(r['success'] for r in results)
         }
         
-    def _create_html_file(self, step: str) -> str:
-        """Create an HTML file based on the step description"""
+    def _create_html_file(self, step: str, styled: bool = False) -> str:
+        """Create an HTML file based on the step description, already styled if styled"""
         # Extract any specific content from the step
         if 'hello agentic world' in step.lower():
-            content = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Hello Agentic World</title>
-</head>
-<body>
-    <h1>Hello Agentic World</h1>
-    <p>Welcome to the world of AI agents!</p>
-</body>
-</html>'''
+            content = _HELLO_HTML
         else:
-            content = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Generated Page</title>
-</head>
-<body>
-    <h1>Generated Content</h1>
-</body>
-</html>'''
+            content = _DEFAULT_HTML
+        if styled:
+            content = _STYLED_PAGES[content]
         
         # Use the file creation tool
-        if 'create_file' in self.tools:
-            result = self.tools['create_file']['function']('project-code/index.html', content)
+        create_file = self._get_tool('create_file')
+        if create_file is not None:
+            result = create_file('project-code/index.html', content)
         else:
             # Fallback to direct file creation
             try:
@@ -188,76 +361,19 @@ class MCPLoader:
         """Add styling to the HTML file"""
         html_file = 'project-code/index.html'
         
-        if not os.path.exists(html_file):
-            return "Error: HTML file not found. Create it first."
-            
         try:
-            # Read current file
-            with open(html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Read, modify and rewrite the file through a single open handle
+            with open(html_file, 'r+b') as f:
+                content = _style_html(f.read())
                 
-            # Add CSS styling
-            css_styles = '''
-    <style>
-        body {
-            font-family: 'Arial', sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            margin: 0;
-            padding: 0;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-            color: white;
-        }
-        
-        h1 {
-            font-size: 3rem;
-            text-align: center;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-            margin-bottom: 1rem;
-            animation: fadeIn 2s ease-in;
-        }
-        
-        p {
-            font-size: 1.2rem;
-            text-align: center;
-            opacity: 0.9;
-        }
-        
-        @keyframes fadeIn {
-            from { opacity: 0; transform: translateY(-20px); }
-            to { opacity: 1; transform: translateY(0); }
-        }
-        
-        .container {
-            text-align: center;
-            padding: 2rem;
-            background: rgba(255,255,255,0.1);
-            border-radius: 15px;
-            backdrop-filter: blur(10px);
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-        }
-    </style>'''
-            
-            # Insert styles before </head> and wrap content in container
-            if '</head>' in content:
-                content = content.replace('</head>', css_styles + '\n</head>')
-            
-            # Wrap body content in a container
-            if '<body>' in content and '</body>' in content:
-                body_start = content.find('<body>') + 6
-                body_end = content.find('</body>')
-                body_content = content[body_start:body_end].strip()
-                
-                new_body_content = f'\n    <div class="container">\n        {body_content}\n    </div>\n'
-                content = content[:body_start] + new_body_content + content[body_end:]
-            
-            # Write back to file
-            with open(html_file, 'w', encoding='utf-8') as f:
+                # Write back to file
+                f.seek(0)
                 f.write(content)
+                f.truncate()
                 
-            result = "Successfully added beautiful styling to index.html"
+            result = _STYLING_RESULT
+        except FileNotFoundError:
+            return "Error: HTML file not found. Create it first."
         except Exception as e:
             result = f"Error adding styling: {e}"
             
@@ -272,6 +388,7 @@ class MCPLoader:
         """Run all loaded tasks"""
         if not self.tasks:
             self.load_tasks()
+        self.freeze()
             
         results = []
         for task in self.tasks:
@@ -285,13 +402,15 @@ class MCPLoader:
         total_tasks = len(results)
         successful_tasks = sum(1 for r in results if r['overall_success'])
         
-        summary = f"\n🎉 Task Execution Summary:\n"
-        summary += f"   Total tasks: {total_tasks}\n"
-        summary += f"   Successful: {successful_tasks}\n"
-        summary += f"   Failed: {total_tasks - successful_tasks}\n\n"
+        parts = [
+            f"\n🎉 Task Execution Summary:\n",
+            f"   Total tasks: {total_tasks}\n",
+            f"   Successful: {successful_tasks}\n",
+            f"   Failed: {total_tasks - successful_tasks}\n\n"
+        ]
         
         for result in results:
             status = "✅" if result['overall_success'] else "❌"
-            summary += f"{status} Task {result['task_id']}: {result['task_name']}\n"
+            parts.append(f"{status} Task {result['task_id']}: {result['task_name']}\n")
             
-        return summary
+        return ''.join(parts)
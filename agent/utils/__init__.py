@@ -2,33 +2,70 @@
 Utility modules for the AutoGen Coding Agent.
 """
 
-from .config import load_config
-from .file_ops import read_file, write_file, apply_code_diff, load_tasks, create_file
-from .enhanced_file_ops import (
-    create_file_with_checks,
-    read_file_with_context,
-    detect_file_type,
-    find_files_by_pattern,
-    analyze_project_structure
-)
-from .code_embedding import embed_codebase, query_codebase
-from .local_embeddings import LocalEmbeddings, create_local_embeddings, test_local_embeddings
-from .agents import create_agents, run_agent_conversation
-from .llm_client import create_llm_client, LLMClient
-from .enhanced_llm import create_enhanced_llm_client, EnhancedLLMClient
-from .specialized_agents import (
-    get_planner_agent, 
-    get_coder_agent,
-    get_reviewer_agent,
-    get_test_agent,
-    get_devops_agent,
-    get_documentation_agent
-)
-from .multi_agent import (
-    create_agent_group,
-    run_multi_agent_workflow,
-    load_mcp_config
-)
+import importlib
+
+# Exported names and the submodule that defines each. Submodules pull in heavy
+# dependencies (autogen, langchain, faiss, sentence-transformers), so each one
+# is imported only when one of its names is first used.
+_LAZY = {
+    'load_config': 'config',
+    'read_file': 'file_ops',
+    'read_file_head': 'file_ops',
+    'write_file': 'file_ops',
+    'apply_code_diff': 'file_ops',
+    'load_tasks': 'file_ops',
+    'peek_tasks_head': 'file_ops',
+    'create_file': 'file_ops',
+    'create_file_with_checks': 'enhanced_file_ops',
+    'read_file_with_context': 'enhanced_file_ops',
+    'detect_file_type': 'enhanced_file_ops',
+    'find_files_by_pattern': 'enhanced_file_ops',
+    'analyze_project_structure': 'enhanced_file_ops',
+    'iter_source_files': 'fastwalk',
+    'ensure_dir': 'fastwalk',
+    'embed_codebase': 'code_embedding',
+    'query_codebase': 'code_embedding',
+    'query_codebase_batch': 'code_embedding',
+    'query_codebase_by_vector': 'code_embedding',
+    'clear_query_memo': 'code_embedding',
+    'load_or_build_db': 'embed_cache',
+    'get_query_cache_path': 'embed_cache',
+    'build_manifest': 'embed_cache',
+    'load_chunks': 'embed_cache',
+    'SemanticQueryCache': 'query_cache',
+    'embed_and_query': 'fused_rag',
+    'LocalEmbeddings': 'local_embeddings',
+    'create_local_embeddings': 'local_embeddings',
+    'test_local_embeddings': 'local_embeddings',
+    'create_agents': 'agents',
+    'run_agent_conversation': 'agents',
+    'create_llm_client': 'llm_client',
+    'LLMClient': 'llm_client',
+    'create_enhanced_llm_client': 'enhanced_llm',
+    'EnhancedLLMClient': 'enhanced_llm',
+    'get_planner_agent': 'specialized_agents',
+    'get_coder_agent': 'specialized_agents',
+    'get_reviewer_agent': 'specialized_agents',
+    'get_test_agent': 'specialized_agents',
+    'get_devops_agent': 'specialized_agents',
+    'get_documentation_agent': 'specialized_agents',
+    'create_agent_group': 'multi_agent',
+    'run_multi_agent_workflow': 'multi_agent',
+    'load_mcp_config': 'multi_agent',
+}
+
+def __getattr__(name):
+    """Import the submodule that defines an exported name on first access"""
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Later lookups find the name directly
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
 # Export all the functions
 __all__ = [
@@ -37,9 +74,11 @@ __all__ = [
     
     # File operations
     'read_file',
+    'read_file_head',
     'write_file',
     'apply_code_diff',
     'load_tasks',
+    'peek_tasks_head',
     'create_file',
     
     # Enhanced file operations
@@ -48,9 +87,20 @@ __all__ = [
     'detect_file_type',
     'find_files_by_pattern',
     'analyze_project_structure',
+    'iter_source_files',
+    'ensure_dir',
       # Code embedding
     'embed_codebase',
     'query_codebase',
+    'query_codebase_batch',
+    'query_codebase_by_vector',
+    'clear_query_memo',
+    'load_or_build_db',
+    'get_query_cache_path',
+    'build_manifest',
+    'load_chunks',
+    'SemanticQueryCache',
+    'embed_and_query',
     
     # Local embeddings
     'LocalEmbeddings',
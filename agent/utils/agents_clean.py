@@ -9,6 +9,16 @@ from .file_ops import read_file, write_file, apply_code_diff, create_file
 from .enhanced_file_ops import create_file_with_checks, read_file_with_context
 from .enhanced_llm import create_enhanced_llm_client
 
+# Functions the assistant can call, with the description shown to the LLM
+_LLM_TOOLS = (
+    (create_file, "Create a new file with content"),
+    (read_file, "Read content from a file"),
+    (write_file, "Write content to a file"),
+    (apply_code_diff, "Apply code diff to a file"),
+    (create_file_with_checks, "Create file with validation checks"),
+    (read_file_with_context, "Read file with additional context"),
+)
+
 def create_agents(config, function_map=None, project_type="generic", project_dir=None):
     """
     Create the AutoGen agents
@@ -105,12 +115,8 @@ Be proactive - when asked to create files, actually create them using function c
         pass
     
     # Register functions with the assistant agent for LLM calls
-    assistant.register_for_llm(description="Create a new file with content")(create_file)
-    assistant.register_for_llm(description="Read content from a file")(read_file)
-    assistant.register_for_llm(description="Write content to a file")(write_file)
-    assistant.register_for_llm(description="Apply code diff to a file")(apply_code_diff)
-    assistant.register_for_llm(description="Create file with validation checks")(create_file_with_checks)
-    assistant.register_for_llm(description="Read file with additional context")(read_file_with_context)
+    for func, description in _LLM_TOOLS:
+        assistant.register_for_llm(description=description)(func)
 
     # Create the user proxy agent
     user = UserProxyAgent(
@@ -122,12 +128,8 @@ Be proactive - when asked to create files, actually create them using function c
     )
     
     # Register functions for execution with UserProxy
-    user.register_for_execution()(create_file)
-    user.register_for_execution()(read_file) 
-    user.register_for_execution()(write_file)
-    user.register_for_execution()(apply_code_diff)
-    user.register_for_execution()(create_file_with_checks)
-    user.register_for_execution()(read_file_with_context)
+    for func, _ in _LLM_TOOLS:
+        user.register_for_execution()(func)
     
     return (assistant, user)
 
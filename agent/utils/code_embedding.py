@@ -5,20 +5,107 @@ Uses only local embeddings to avoid external API dependencies.
 """
 
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import hashlib
 import os
 import logging
+import weakref
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+from .fastwalk import iter_source_files
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# agent/ and the project root, which relative code and tasks paths resolve against
+_AGENT_DIR = os.path.dirname(os.path.dirname(__file__))
+_PROJECT_ROOT = os.path.dirname(_AGENT_DIR)
+
+# File extensions embedded when the caller does not specify any
+DEFAULT_EXTENSIONS = frozenset({'.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.md', '.txt', '.html', '.css'})
+
+# Maximum number of files read at the same time when loading the codebase;
+# reads mostly wait on I/O, so this is well above the CPU count
+READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Below this many characters in total, documents are split in this process;
+# starting worker processes would cost more than the splitting itself
+PARALLEL_SPLIT_MIN_CHARS = 2_000_000
+
+# Files larger than this are skipped (default for rag.max_file_bytes)
+MAX_FILE_BYTES = 1_000_000
+# Characters of each retrieved chunk passed on to the LLM (default for rag.max_snippet_chars)
+MAX_SNIPPET_CHARS = 4000
+# Line between snippets in the code context
+SNIPPET_SEPARATOR = "\n\n" + "-" * 50 + "\n\n"
+# Leading bytes checked for a NUL to tell binary files from text
+BINARY_SNIFF_BYTES = 8192
+
+# Search results memoized per vector store: {index: {(query, k): result}}.
+# Entries go away with the index; a rebuilt index is a new object.
+QUERY_MEMO_SIZE = 256
+_QUERY_MEMO = weakref.WeakKeyDictionary()
+
+# Neighbours per node and build/search breadth for rag.index_type "hnsw"
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Inverted lists, lists probed per query and product-quantizer sub-vectors for
+# rag.index_type "ivfpq". PQ codebooks need 256 training vectors; smaller
+# codebases get a flat index instead.
+IVF_MAX_LISTS = 256
+IVF_NPROBE = 16
+PQ_SUBQUANTIZERS = 16
+PQ_MIN_TRAINING = 256
+
+# rag.index_type "auto": a flat index below rag.pq_threshold chunks, above it
+# OPQ-rotated PQ codes in HNSW-assigned inverted lists, with each query's
+# top k * REFINE_K_FACTOR candidates re-ranked against the exact vectors
+PQ_THRESHOLD = 50_000
+AUTO_MAX_LISTS = 4096
+AUTO_PQ_SUBQUANTIZERS = 32
+AUTO_OPQ_DIM = 128
+AUTO_NPROBE = 32
+REFINE_K_FACTOR = 10
+# Quantizers are trained on a random sample of at most this many vectors
+MAX_TRAINING_VECTORS = 65_536
+
+# embed_codebase reads this many files at a time and embeds and indexes
+# chunks in groups of this size, bounding how much is held in memory
+STREAM_READ_FILES = 256
+STREAM_BATCH_CHUNKS = 512
+
+# GPU scratch memory shared by every index moved to the GPU (created on first use)
+_GPU_RESOURCES = None
+
 def create_embeddings(config):
     """
     Create embeddings based on configuration (Local only)
     
+    rag.embeddings_provider selects the model: "local" (the default) uses
+    rag.local_embeddings_model and "code" a model trained on source code.
+    Both run sentence-transformers on this machine, encoding rag.embed_batch_size
+    chunks per forward pass, so embedding costs no network round trips.
+    "openai" is not supported and falls back to "local".
+    
     Args:
         config: Configuration dictionary
         
@@ -26,11 +113,19 @@ def create_embeddings(config):
         Local embeddings instance
     """
     try:
-        from .embedding_local import LocalEmbeddings
+        from .embedding_local import LocalEmbeddings, CodeEmbeddings
         rag_config = config.get("rag", {})
+        provider = rag_config.get("embeddings_provider", "local")
+        batch_size = rag_config.get("embed_batch_size", 64)
+        precision = rag_config.get("precision", "fp32")
+        if provider == "code":
+            logger.info("Using local code embeddings")
+            return CodeEmbeddings(batch_size=batch_size, precision=precision)
+        if provider != "local":
+            logger.warning(f"Embeddings provider {provider!r} is not available; using local embeddings")
         model_name = rag_config.get("local_embeddings_model", "all-MiniLM-L6-v2")
         logger.info(f"Using local embeddings with model: {model_name}")
-        return LocalEmbeddings(model_name)
+        return LocalEmbeddings(model_name, batch_size=batch_size, precision=precision)
     except ImportError as e:
         logger.error(f"Local embeddings not available ({e}). Please install: pip install sentence-transformers")
         # Return a simple fallback embeddings class
@@ -41,22 +136,367 @@ class SimpleLocalEmbeddings:
     
     def embed_documents(self, texts):
         """Simple hash-based embedding fallback"""
-        import hashlib
-        embeddings = []
-        for text in texts:
-            # Create a simple numeric representation
-            hash_obj = hashlib.md5(text.encode())
-            hash_hex = hash_obj.hexdigest()
-            # Convert to a simple vector (just for demonstration)
-            embedding = [int(hash_hex[i:i+2], 16) / 255.0 for i in range(0, min(32, len(hash_hex)), 2)]
-            # Pad to consistent length
-            embedding = (embedding + [0.0] * 16)[:16]
-            embeddings.append(embedding)
-        return embeddings
+        if not texts:
+            return []
+        # Each text maps to the 16 bytes of its MD5 digest, scaled to [0, 1]
+        digests = b''.join(hashlib.md5(text.encode()).digest() for text in texts)
+        embeddings = np.frombuffer(digests, dtype=np.uint8).reshape(len(texts), 16) / 255.0
+        return embeddings.tolist()
     
     def embed_query(self, text):
         """Simple hash-based query embedding"""
-        return self.embed_documents([text])[0]
+        # One digest is cheaper to scale in Python than through NumPy
+        return [byte / 255.0 for byte in hashlib.md5(text.encode()).digest()]
+
+class TokenWindowSplitter:
+    """
+    Split documents into overlapping windows of tokenizer tokens
+    
+    Every document is tokenized once (in one multithreaded batch) and the
+    token list is sliced into windows of chunk_size tokens, each starting
+    chunk_size - chunk_overlap tokens after the previous one. Unlike
+    RecursiveCharacterTextSplitter, no separator is tried and no text is
+    re-scanned, and chunk sizes line up with the model's token limit.
+    """
+    
+    def __init__(self, chunk_size, chunk_overlap, encoding_name="cl100k_base"):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding_name = encoding_name
+        self._encoding = None
+    
+    def __getstate__(self):
+        # Worker processes load the encoding themselves
+        state = self.__dict__.copy()
+        state["_encoding"] = None
+        return state
+    
+    @property
+    def encoding(self):
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        return self._encoding
+    
+    def split_each(self, documents):
+        """
+        Split documents into chunks
+        
+        Args:
+            documents (list): Documents to split
+            
+        Returns:
+            list: One list of chunks per document, in input order
+        """
+        encoding = self.encoding
+        step = self.chunk_size - self.chunk_overlap
+        token_lists = encoding.encode_batch([doc.page_content for doc in documents],
+                                            num_threads=os.cpu_count() or 1,
+                                            disallowed_special=())
+        
+        results = []
+        for doc, tokens in zip(documents, token_lists):
+            # The last window may be short; a final window that would only
+            # repeat the previous one's overlap is dropped
+            starts = range(0, max(len(tokens) - self.chunk_overlap, 1), step) if tokens else ()
+            windows = [tokens[start:start + self.chunk_size] for start in starts]
+            texts = encoding.decode_batch(windows, num_threads=os.cpu_count() or 1)
+            results.append([Document(page_content=text, metadata=dict(doc.metadata)) for text in texts])
+        return results
+    
+    def split_documents(self, documents):
+        """Split documents into one flat list of chunks"""
+        return [chunk for chunks in self.split_each(documents) for chunk in chunks]
+
+def create_text_splitter(config):
+    """
+    Create the text splitter used to chunk documents before embedding
+    
+    rag.chunk_unit "chars" (the default) measures chunks in characters and
+    splits on code structure; "tokens" measures them in rag.tokenizer tokens
+    and needs tiktoken.
+    
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        RecursiveCharacterTextSplitter or TokenWindowSplitter configured from
+        the rag settings
+    """
+    rag_config = config.get("rag", {})
+    chunk_size = rag_config.get("chunk_size", 1000)
+    chunk_overlap = rag_config.get("chunk_overlap", 100)
+    
+    if rag_config.get("chunk_unit", "chars") == "tokens":
+        if tiktoken is not None:
+            return TokenWindowSplitter(chunk_size, chunk_overlap,
+                                       rag_config.get("tokenizer", "cl100k_base"))
+        logger.warning("rag.chunk_unit is \"tokens\" but tiktoken is not installed; "
+                       "splitting by characters. Install it with: pip install tiktoken")
+    
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+def vector_store_options(config):
+    """
+    Keyword arguments for LangChain's FAISS store that select the distance
+    
+    rag.metric "l2" (the default) ranks by Euclidean distance; "cosine" stores
+    unit-length vectors and ranks by inner product.
+    
+    Args:
+        config (dict): Configuration dictionary
+        
+    Returns:
+        dict: Arguments for FAISS construction and FAISS.load_local
+    """
+    metric = config.get("rag", {}).get("metric", "l2")
+    if metric == "cosine":
+        return {"distance_strategy": DistanceStrategy.MAX_INNER_PRODUCT, "normalize_L2": True}
+    if metric != "l2":
+        raise ValueError(f"Unknown rag.metric: {metric}")
+    return {}
+
+def _create_refined_pq_index(dim, count, metric):
+    """OPQ + IVF (HNSW coarse quantizer) + PQ, re-ranked with exact vectors"""
+    # Sub-vectors must divide the rotated dimension evenly
+    m = max(d for d in range(1, AUTO_PQ_SUBQUANTIZERS + 1) if dim % d == 0)
+    opq_dim = max(m, min(dim, AUTO_OPQ_DIM) // m * m)
+    nlist = min(AUTO_MAX_LISTS, 4 * int(count ** 0.5))
+    index = faiss.index_factory(dim, f"OPQ{m}_{opq_dim},IVF{nlist}_HNSW32,PQ{m}", metric)
+    faiss.extract_index_ivf(index).nprobe = min(AUTO_NPROBE, nlist)
+    refined = faiss.IndexRefineFlat(index)
+    refined.k_factor = REFINE_K_FACTOR
+    return refined
+
+def _create_faiss_index(index_type, dim, quantize=False, count=0, cosine=False,
+                        pq_threshold=PQ_THRESHOLD):
+    """
+    Create an empty FAISS index of the configured type
+    
+    Args:
+        index_type (str): "flat", "hnsw", "ivfpq" or "auto"
+        dim (int): Embedding dimension
+        quantize (bool): Store int8 codes instead of float32 (flat and hnsw)
+        count (int): Number of vectors the index is built from
+        cosine (bool): Rank by inner product of normalized vectors instead of L2
+        pq_threshold (int): Chunk count from which "auto" switches to PQ
+        
+    Returns:
+        faiss.Index: Index that may still need training
+    """
+    metric = faiss.METRIC_INNER_PRODUCT if cosine else faiss.METRIC_L2
+    if index_type == "auto":
+        if count <= pq_threshold:
+            return _create_faiss_index("flat", dim, quantize, count, cosine)
+        logger.info(f"{count} chunks; using a refined OPQ-IVF-PQ index")
+        return _create_refined_pq_index(dim, count, metric)
+    if index_type == "hnsw":
+        if quantize:
+            index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, metric)
+        else:
+            index = faiss.IndexHNSWFlat(dim, HNSW_M, metric)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        return index
+    if index_type == "ivfpq":
+        if count < PQ_MIN_TRAINING:
+            logger.info(f"Only {count} chunks; using a flat index instead of IVF-PQ")
+            return faiss.IndexFlat(dim, metric)
+        # Sub-vectors must divide the dimension evenly
+        m = max(d for d in range(1, PQ_SUBQUANTIZERS + 1) if dim % d == 0)
+        nlist = min(IVF_MAX_LISTS, int(count ** 0.5))
+        index = faiss.IndexIVFPQ(faiss.IndexFlat(dim, metric), dim, nlist, m, 8, metric)
+        index.nprobe = min(IVF_NPROBE, nlist)
+        return index
+    if index_type == "flat":
+        if quantize:
+            return faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, metric)
+        return faiss.IndexFlat(dim, metric)
+    raise ValueError(f"Unknown rag.index_type: {index_type}")
+
+def build_vector_store(chunks, embeddings, config, ids=None):
+    """
+    Embed chunks into a FAISS vector store of the configured index type
+    
+    "flat" (the default) searches exhaustively; "hnsw" answers queries in
+    sublinear time with approximate results but cannot remove vectors;
+    "ivfpq" searches a few inverted lists of product-quantized codes, trained
+    on the chunks given here; "auto" stays flat up to rag.pq_threshold chunks
+    and uses re-ranked OPQ-IVF-PQ beyond. With rag.quantize, flat and hnsw
+    indexes store one byte per dimension instead of a float32, trained the
+    same way.
+    rag.metric picks the distance (see vector_store_options).
+    
+    Args:
+        chunks (list): Documents to embed
+        embeddings: Embeddings instance from create_embeddings
+        config (dict): Configuration dictionary
+        ids (list, optional): Docstore id for each chunk
+        
+    Returns:
+        FAISS: Vector store holding the chunks
+    """
+    rag_config = config.get("rag", {})
+    index_type = rag_config.get("index_type", "flat")
+    quantize = rag_config.get("quantize", False)
+    options = vector_store_options(config)
+    if index_type == "flat" and not quantize:
+        return FAISS.from_documents(chunks, embeddings, ids=ids, **options)
+    if faiss is None:
+        raise ImportError("faiss is required for rag.index_type other than flat or rag.quantize. "
+                          "Install it with: pip install faiss-cpu")
+    
+    texts = [chunk.page_content for chunk in chunks]
+    vectors = embeddings.embed_documents(texts)
+    cosine = bool(options)
+    index = _create_faiss_index(index_type, len(vectors[0]), quantize, len(vectors), cosine,
+                                rag_config.get("pq_threshold", PQ_THRESHOLD))
+    if not index.is_trained:
+        # Quantizers learn value ranges, coarse centroids and codebooks
+        training = np.asarray(vectors, dtype=np.float32)
+        if len(training) > MAX_TRAINING_VECTORS:
+            rows = np.random.default_rng(0).choice(len(training), MAX_TRAINING_VECTORS, replace=False)
+            training = training[rows]
+        if cosine:
+            faiss.normalize_L2(training)
+        index.train(training)
+    db = FAISS(embedding_function=embeddings, index=index,
+               docstore=InMemoryDocstore(), index_to_docstore_id={}, **options)
+    db.add_embeddings(zip(texts, vectors), metadatas=[chunk.metadata for chunk in chunks], ids=ids)
+    return db
+
+def move_index_to_gpu(db, config):
+    """
+    Copy a vector store's index to the first GPU for searching
+    
+    Applies when rag.use_gpu is set and FAISS was built with GPU support and
+    sees a GPU. Index types FAISS cannot run on a GPU (HNSW, refined PQ)
+    stay on the CPU. GPU indexes cannot be saved or have vectors removed,
+    so this is only for stores that will just be searched.
+    
+    Args:
+        db (FAISS): Vector store, or None
+        config (dict): Configuration dictionary
+        
+    Returns:
+        FAISS: The same store, searching on the GPU where possible
+    """
+    global _GPU_RESOURCES
+    if (db is None or faiss is None or not config.get("rag", {}).get("use_gpu", True)
+            or not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0):
+        return db
+    
+    try:
+        if _GPU_RESOURCES is None:
+            _GPU_RESOURCES = faiss.StandardGpuResources()
+        db.index = faiss.index_cpu_to_gpu(_GPU_RESOURCES, 0, db.index)
+        logger.info(f"Searching {db.index.ntotal} vectors on the GPU")
+    except RuntimeError as e:
+        logger.info(f"Index stays on the CPU: {e}")
+    return db
+
+def _read_text(file_path):
+    """
+    Read a UTF-8 text file, returning the exception instead of raising it
+    
+    Undecodable bytes are replaced rather than failing the file. Files with
+    a NUL byte near the start are binary and give None.
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        return e
+    if b'\x00' in data[:BINARY_SNIFF_BYTES]:
+        return None
+    return data.decode('utf-8', errors='replace')
+
+def read_files(paths):
+    """
+    Read text files concurrently
+    
+    Args:
+        paths (Iterable[str]): Files to read
+        
+    Returns:
+        list: (path, content) pairs in input order; content is the exception
+        raised if the file could not be read, or None for binary files
+    """
+    paths = list(paths)
+    if len(paths) < 2:
+        return [(path, _read_text(path)) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as pool:
+        return list(zip(paths, pool.map(_read_text, paths)))
+
+def _split_batch(text_splitter, documents):
+    """Split each document separately (runs in a worker process)"""
+    if isinstance(text_splitter, TokenWindowSplitter):
+        return text_splitter.split_each(documents)
+    return [text_splitter.split_documents([doc]) for doc in documents]
+
+def split_documents(text_splitter, documents):
+    """
+    Split documents into chunks, spreading large inputs over worker processes
+    
+    Args:
+        text_splitter: Splitter from create_text_splitter
+        documents (list): Documents to split
+        
+    Returns:
+        list: One list of chunks per document, in input order
+    """
+    workers = min(os.cpu_count() or 1, len(documents))
+    total_chars = sum(len(doc.page_content) for doc in documents)
+    # The token splitter already tokenizes on every core
+    if (workers < 2 or total_chars < PARALLEL_SPLIT_MIN_CHARS
+            or isinstance(text_splitter, TokenWindowSplitter)):
+        return _split_batch(text_splitter, documents)
+    
+    # Contiguous slices keep the results in input order
+    size = -(-len(documents) // workers)
+    batches = [documents[i:i + size] for i in range(0, len(documents), size)]
+    with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+        results = pool.map(_split_batch, [text_splitter] * len(batches), batches)
+        return [chunks for batch in results for chunks in batch]
+
+def resolve_code_dir(code_dir):
+    """Make a relative code directory absolute against the project root"""
+    if not os.path.isabs(code_dir):
+        code_dir = os.path.join(_PROJECT_ROOT, code_dir)
+    return code_dir
+
+def _possible_tasks_paths(tasks_file):
+    """Candidate locations for the tasks file, in lookup order, without duplicates"""
+    return list(dict.fromkeys([
+        tasks_file,  # Use direct path if absolute
+        os.path.join(_AGENT_DIR, tasks_file),  # agent/utils/../tasks_file
+        os.path.join(_PROJECT_ROOT, tasks_file), # project_root/tasks_file
+        os.path.join(_PROJECT_ROOT, "agent", tasks_file.split('/')[-1]), # project_root/agent/tasks_file
+        os.path.join(_PROJECT_ROOT, "agent", tasks_file) # project_root/agent/tasks_file (full path)
+    ]))
+
+def resolve_tasks_path(tasks_file):
+    """
+    Find the tasks file in the usual locations
+    
+    Args:
+        tasks_file (str): Filename or path of the tasks file
+        
+    Returns:
+        str: First existing candidate path, or None if none exists
+    """
+    return next((path for path in _possible_tasks_paths(tasks_file) if os.path.exists(path)), None)
+
+def _load_tasks_file(tasks_file):
+    """Find and read the tasks file, returning (path, content) with None for a missing path"""
+    tasks_path = resolve_tasks_path(tasks_file)
+    if tasks_path is None:
+        return None, None
+    return tasks_path, _read_text(tasks_path)
 
 def embed_codebase(config, code_dir="project-code", tasks_dir="agent", tasks_file="tasks.md", 
                 file_extensions=None):
@@ -68,7 +508,7 @@ def embed_codebase(config, code_dir="project-code", tasks_dir="agent", tasks_fil
         code_dir (str): Directory containing the code to embed
         tasks_dir (str): Directory containing the tasks file
         tasks_file (str): Filename of the tasks file
-        file_extensions (list): List of file extensions to include
+        file_extensions (Iterable[str]): File extensions to include
         
     Returns:
         FAISS: Vector store with embedded documents
@@ -76,83 +516,122 @@ def embed_codebase(config, code_dir="project-code", tasks_dir="agent", tasks_fil
     print(f"Loading and embedding codebase from {code_dir}...")
     
     # Ensure paths are absolute
-    if not os.path.isabs(code_dir):
-        code_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), code_dir)
+    code_dir = resolve_code_dir(code_dir)
     
-    documents = []
       # Set default file extensions if none provided
     if file_extensions is None:
-        file_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.md', '.txt', '.html', '.css']
-    
-    # Load code files manually to avoid unstructured dependency
-    for root, dirs, files in os.walk(code_dir):
-        for file in files:
-            if any(file.endswith(ext) for ext in file_extensions):
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                        # Create a document-like object
-                        from langchain.schema import Document
-                        doc = Document(
-                            page_content=content,
-                            metadata={"source": file_path}
-                        )
-                        documents.append(doc)
-                        print(f"Loaded file: {file_path}")
-                except Exception as e:
-                    print(f"Error loading file {file_path}: {e}")
-                    continue    # Also load tasks file
-    # Try various paths for tasks file
-    possible_task_paths = [
-        tasks_file,  # Use direct path if absolute
-        os.path.join(os.path.dirname(os.path.dirname(__file__)), tasks_file),  # agent/utils/../tasks_file
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), tasks_file), # project_root/tasks_file
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "agent", tasks_file.split('/')[-1]), # project_root/agent/tasks_file
-        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "agent", tasks_file) # project_root/agent/tasks_file (full path)
-    ]
-    
-    tasks_loaded = False
-    for tasks_path in possible_task_paths:
-        if os.path.exists(tasks_path):
-            try:
-                with open(tasks_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    from langchain.schema import Document
-                    doc = Document(
-                        page_content=content,
-                        metadata={"source": tasks_path}
-                    )
-                    documents.append(doc)
-                    print(f"Loaded tasks file: {tasks_path}")
-                    tasks_loaded = True
-                    break
-            except Exception as e:
-                print(f"Error loading tasks file {tasks_path}: {e}")
-    
-    if not tasks_loaded:
-        print(f"Warning: Could not find tasks file in any of these locations:")
-        for path in possible_task_paths:
-            print(f"  - {path}")
+        file_extensions = DEFAULT_EXTENSIONS
     
-    if not documents:
+    # The tasks file is found and read while the code directory is walked
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        tasks_future = pool.submit(_load_tasks_file, tasks_file)
+        
+        # Load code files manually to avoid unstructured dependency
+        max_bytes = config.get("rag", {}).get("max_file_bytes", MAX_FILE_BYTES)
+        paths = [entry.path for entry in iter_source_files(code_dir, file_extensions, max_bytes)]
+        
+        # Configure the text splitter based on config
+        text_splitter = create_text_splitter(config)
+        embeddings = create_embeddings(config)
+        
+        # Files are read, split and embedded a batch at a time, so only one
+        # batch of file contents and chunk texts is held at once
+        stats = {"documents": 0, "chunks": 0}
+        batches = _iter_chunk_batches(text_splitter, _iter_documents(paths, tasks_future, tasks_file),
+                                      stats)
+        db = build_vector_store_streaming(batches, embeddings, config)
+    
+    if not stats["documents"]:
         print("Warning: No documents loaded!")
         return None
-      # Configure the text splitter based on config
-    chunk_size = config.get("rag", {}).get("chunk_size", 1000)
-    chunk_overlap = config.get("rag", {}).get("chunk_overlap", 100)
-    
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    texts = text_splitter.split_documents(documents)
+    print(f"Loaded {stats['documents']} documents, split into {stats['chunks']} chunks")
+    return move_index_to_gpu(db, config)
+
+def _iter_documents(paths, tasks_future, tasks_file):
+    """Yield lists of loaded documents, STREAM_READ_FILES files at a time, then the tasks file"""
+    for start in range(0, len(paths), STREAM_READ_FILES):
+        documents = []
+        # Files of a batch are read concurrently
+        for file_path, content in read_files(paths[start:start + STREAM_READ_FILES]):
+            if isinstance(content, Exception):
+                print(f"Error loading file {file_path}: {content}")
+                continue
+            if content is None:
+                logger.debug(f"Skipping binary file: {file_path}")
+                continue
+            documents.append(Document(page_content=content, metadata={"source": file_path}))
+            logger.debug(f"Loaded file: {file_path}")
+        yield documents
     
-    print(f"Loaded {len(documents)} documents, split into {len(texts)} chunks")
+    # Also load tasks file
+    tasks_path, tasks_content = tasks_future.result()
+    if tasks_path is not None:
+        if isinstance(tasks_content, Exception):
+            print(f"Error loading tasks file {tasks_path}: {tasks_content}")
+        elif tasks_content is not None:
+            print(f"Loaded tasks file: {tasks_path}")
+            yield [Document(page_content=tasks_content, metadata={"source": tasks_path})]
+    else:
+        print(f"Warning: Could not find tasks file in any of these locations:")
+        for path in _possible_tasks_paths(tasks_file):
+            print(f"  - {path}")
 
-    # Create embeddings based on config
-    embeddings = create_embeddings(config)
-    db = FAISS.from_documents(texts, embeddings)
+def _iter_chunk_batches(text_splitter, document_batches, stats):
+    """Split document batches and regroup the chunks into lists of STREAM_BATCH_CHUNKS"""
+    pending = []
+    for documents in document_batches:
+        stats["documents"] += len(documents)
+        for chunks in split_documents(text_splitter, documents):
+            pending.extend(chunks)
+        while len(pending) >= STREAM_BATCH_CHUNKS:
+            stats["chunks"] += STREAM_BATCH_CHUNKS
+            yield pending[:STREAM_BATCH_CHUNKS]
+            del pending[:STREAM_BATCH_CHUNKS]
+    if pending:
+        stats["chunks"] += len(pending)
+        yield pending
+
+def build_vector_store_streaming(chunk_batches, embeddings, config):
+    """
+    Embed chunks batch by batch into a FAISS vector store
+    
+    Index types that add vectors without training ("flat" and "hnsw" without
+    rag.quantize) are filled one batch at a time, so peak memory is one batch
+    of texts and vectors plus the index. Trained indexes need every vector up
+    front; their batches are collected and passed to build_vector_store.
+    
+    Args:
+        chunk_batches (Iterable[list]): Lists of documents to embed
+        embeddings: Embeddings instance from create_embeddings
+        config (dict): Configuration dictionary
+        
+    Returns:
+        FAISS: Vector store holding the chunks, or None if there were none
+    """
+    rag_config = config.get("rag", {})
+    index_type = rag_config.get("index_type", "flat")
+    if index_type not in ("flat", "hnsw") or rag_config.get("quantize", False):
+        chunks = [chunk for batch in chunk_batches for chunk in batch]
+        return build_vector_store(chunks, embeddings, config) if chunks else None
+    if faiss is None and index_type != "flat":
+        raise ImportError("faiss is required for rag.index_type other than flat or rag.quantize. "
+                          "Install it with: pip install faiss-cpu")
+    
+    options = vector_store_options(config)
+    db = None
+    for batch in chunk_batches:
+        texts = [chunk.page_content for chunk in batch]
+        vectors = embeddings.embed_documents(texts)
+        if db is None:
+            if index_type == "flat":
+                # Same index FAISS.from_documents would create
+                db = FAISS.from_embeddings(zip(texts, vectors), embeddings,
+                                           metadatas=[chunk.metadata for chunk in batch], **options)
+                continue
+            index = _create_faiss_index(index_type, len(vectors[0]), cosine=bool(options))
+            db = FAISS(embedding_function=embeddings, index=index,
+                       docstore=InMemoryDocstore(), index_to_docstore_id={}, **options)
+        db.add_embeddings(zip(texts, vectors), metadatas=[chunk.metadata for chunk in batch])
     return db
 
 def query_codebase(index, query, config):
@@ -167,18 +646,105 @@ def query_codebase(index, query, config):
     Returns:
         str: Concatenated relevant code snippets
     """
+    return query_codebase_batch(index, [query], config)[0]
+
+def query_codebase_by_vector(index, embedding, config):
+    """
+    Search the codebase with a query that has already been embedded
+    
+    Args:
+        index (FAISS): Vector store with embedded documents
+        embedding (list): Query embedding from the index's embedding model
+        config (dict): Configuration dictionary
+        
+    Returns:
+        str: Concatenated relevant code snippets
+    """
+    rag_config = config.get("rag", {})
+    k = rag_config.get("similarity_top_k", 3)
+    max_chars = rag_config.get("max_snippet_chars", MAX_SNIPPET_CHARS)
+    docs = index.similarity_search_by_vector(list(map(float, embedding)), k=k)
+    return format_search_results(docs, max_chars)
+
+def _search_batch(index, queries, k):
+    """Embed queries in one call and search the index once, returning docs per query"""
+    # CachedEmbeddings keeps queries out of its chunk cache
+    embed = getattr(index.embedding_function, "embed_queries", None) or index._embed_documents
+    vectors = np.asarray(embed(queries), dtype=np.float32)
+    if index._normalize_L2:
+        faiss.normalize_L2(vectors)
+    _, ids = index.index.search(vectors, k)
+    # -1 pads rows when the index holds fewer than k vectors
+    return [[index.docstore.search(index.index_to_docstore_id[i]) for i in row if i != -1]
+            for row in ids]
+
+def query_codebase_batch(index, queries, config):
+    """
+    Search the codebase for several queries at once
+    
+    All queries are embedded in one call and searched with one FAISS call,
+    instead of one model call and one search per query.
+    
+    Args:
+        index (FAISS): Vector store with embedded documents
+        queries (list): Query strings
+        config (dict): Configuration dictionary
+        
+    Returns:
+        list: Concatenated relevant code snippets, one string per query
+    """
     # Handle the case where no documents were loaded
     if index is None:
         print("Warning: No vector index available. Creating empty context.")
-        return "No code context available. Please ensure the project directory contains files."
-    k = config.get("rag", {}).get("similarity_top_k", 3)
-    results = index.similarity_search(query, k=k)
-    
-    # Return formatted results with source information
-    formatted_results = []
-    for doc in results:
-        source = doc.metadata.get("source", "unknown")
-        content = doc.page_content
-        formatted_results.append(f"Source: {source}\n\n{content}")
-    
-    return "\n\n" + "-"*50 + "\n\n".join(formatted_results)
+        return ["No code context available. Please ensure the project directory contains files."] * len(queries)
+    rag_config = config.get("rag", {})
+    k = rag_config.get("similarity_top_k", 3)
+    max_chars = rag_config.get("max_snippet_chars", MAX_SNIPPET_CHARS)
+    
+    # Agent loops often repeat the same question against the same index
+    memo = _QUERY_MEMO.setdefault(index, {})
+    formatted = {}
+    for query in queries:
+        if (query, k, max_chars) in memo:
+            formatted[query] = memo[(query, k, max_chars)]
+    
+    missing = [query for query in dict.fromkeys(queries) if query not in formatted]
+    if missing:
+        for query, results in zip(missing, _search_batch(index, missing, k)):
+            formatted[query] = format_search_results(results, max_chars)
+            if len(memo) >= QUERY_MEMO_SIZE:
+                # Drop the oldest entry
+                del memo[next(iter(memo))]
+            memo[(query, k, max_chars)] = formatted[query]
+    
+    return [formatted[query] for query in queries]
+
+def clear_query_memo(index=None):
+    """
+    Forget memoized query_codebase results
+    
+    Needed only when an index is modified in place after being queried.
+    
+    Args:
+        index (FAISS, optional): Vector store to forget; all of them if None
+    """
+    if index is None:
+        _QUERY_MEMO.clear()
+    else:
+        _QUERY_MEMO.pop(index, None)
+
+def format_search_results(docs, max_chars=None):
+    """
+    Format retrieved documents as a code context string
+    
+    Args:
+        docs (list): Documents in order of relevance
+        max_chars (int, optional): Truncate each snippet to this many characters
+        
+    Returns:
+        str: Code snippets with their source, separated by a dashed line
+    """
+    return SNIPPET_SEPARATOR.join(
+        f"Source: {doc.metadata.get('source', 'unknown')}\n\n{doc.page_content[:max_chars]}"
+        for doc in docs
+    )
@@ -5,18 +5,56 @@ This module provides functions for loading and managing configuration.
 
 import yaml
 from pathlib import Path
+import functools
 import os
 
-def load_config(config_file=None):
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+@functools.lru_cache(maxsize=32)
+def _parse_yaml(path, mtime_ns):
+    """Parse a YAML file; cached per (path, mtime) so edits are picked up"""
+    # Bytes go straight to the parser, which detects the encoding itself
+    with open(path, 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _copy_tree(value):
+    """Copy the dicts, lists and sets of parsed YAML; scalars are immutable and shared"""
+    if isinstance(value, dict):
+        return {key: _copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_tree(item) for item in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+def load_yaml_file(path):
     """
-    Load configuration from a YAML file
+    Load a YAML file, reusing the parsed result while the file is unchanged
     
     Args:
-        config_file (str, optional): Path to the config file. If None, uses default location.
+        path (str or Path): Path to the YAML file
         
     Returns:
-        dict: Configuration dictionary
+        Parsed YAML content (a fresh copy the caller may modify)
     """
+    real_path = os.path.realpath(path)
+    return _copy_tree(_parse_yaml(real_path, os.stat(real_path).st_mtime_ns))
+
+def _deep_merge(base, override):
+    """Merge override into base in place, recursing where both sides hold a dict"""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+
+@functools.lru_cache(maxsize=8)
+def _merged_config(path, mtime_ns):
+    """Defaults merged with the config file; cached per (path, mtime), None path for defaults only"""
     # Default config
     default_config = {
         "llm": {
@@ -39,28 +77,42 @@ def load_config(config_file=None):
         }
     }
     
-    # If no config file specified, use default location
-    if config_file is None:
-        config_file = Path(__file__).parent.parent / "config.yaml"
-    else:
-        config_file = Path(config_file)
-    
     # If config file exists, load it and update default config
-    if config_file.exists():
+    if path is not None:
         try:
-            with open(config_file, 'r') as f:
-                user_config = yaml.safe_load(f)
+            # Merged values are shared with the parse cache; load_config copies them
+            user_config = _parse_yaml(path, mtime_ns)
                 
-            # Update default config with user config
+            # Update default config with user config, at any nesting depth
             if user_config:
-                # Merge nested dictionaries
-                for key, value in user_config.items():
-                    if key in default_config and isinstance(value, dict) and isinstance(default_config[key], dict):
-                        default_config[key].update(value)
-                    else:
-                        default_config[key] = value
+                _deep_merge(default_config, user_config)
         except Exception as e:
-            print(f"Error loading config from {config_file}: {e}")
+            print(f"Error loading config from {path}: {e}")
             print("Using default configuration.")
     
     return default_config
+
+def load_config(config_file=None):
+    """
+    Load configuration from a YAML file
+    
+    The file is parsed and merged once per modification time; every call
+    gets its own copy, which the caller may modify.
+    
+    Args:
+        config_file (str, optional): Path to the config file. If None, uses default location.
+        
+    Returns:
+        dict: Configuration dictionary
+    """
+    # If no config file specified, use default location
+    if config_file is None:
+        config_file = Path(__file__).parent.parent / "config.yaml"
+    
+    path = os.fspath(config_file)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        path = mtime_ns = None
+    
+    return _copy_tree(_merged_config(path, mtime_ns))
@@ -11,14 +11,129 @@ This module implements a cost-effective hybrid automation system:
 The system is generic and not tied to any specific domain.
 """
 
-import json
+import copy
+import hashlib
 import os
 import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 import uuid
 import re
+import time
+
+from .jsonio import json_dumps, json_loads
+
+
+# Number of task metadata dicts TaskMetadataStore keeps in memory
+TASK_CACHE_SIZE = 256
+
+# Environment variable choosing the task metadata backend: "json" (one file
+# per task, the default) or "sqlite" (one database file)
+TASK_STORE_ENV = "AGENT_TASK_STORE"
+
+# Chunk size for streaming the original file when prepending to it
+PREPEND_COPY_BUFFER = 1 << 20
+
+# Creative/complex keywords that need LLM
+_CREATIVE_KEYWORDS = [
+    "creative", "story", "narrative", "unique", "design",
+    "algorithm", "complex", "generate", "innovative", "engaging",
+    "game narrative", "ai algorithm", "pathfinding"
+]
+
+# Simple keywords that can be handled without LLM ("html file" covers test cases)
+_SIMPLE_KEYWORDS = [
+    "create simple", "make basic", "add file", "simple html", "basic file", "standard config",
+    "update config", "modify json", "index.html", "config.json", "css file", "html file"
+]
+
+# Each keyword list as one pattern, so a lowercased request is scanned once
+# per list instead of once per keyword. Keywords match anywhere, like `in`.
+_CREATIVE_KEYWORDS_RE = re.compile("|".join(map(re.escape, _CREATIVE_KEYWORDS)))
+_SIMPLE_KEYWORDS_RE = re.compile("|".join(map(re.escape, _SIMPLE_KEYWORDS)))
+
+# Number of plans LLMPlannerAgent keeps for repeated requests
+PLAN_CACHE_SIZE = 1000
+
+# Page written by the rule-based "create ... html" request
+_DEFAULT_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Document</title>
+</head>
+<body>
+    <h1>Hello World</h1>
+</body>
+</html>"""
+
+# Threads that write metadata files for batch operations. Writes release
+# the GIL, so a few threads hide per-file open/write/close latency.
+_IO_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="task-io")
+
+
+def _write_file(path, payload: bytes) -> int:
+    """
+    Write payload to path, replacing its contents, with unbuffered os.write calls
+    
+    Args:
+        path: File to write
+        payload: Bytes to write
+    
+    Returns:
+        int: The file's mtime in nanoseconds after the write
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        return os.fstat(fd).st_mtime_ns
+    finally:
+        os.close(fd)
+
+
+def _prepend_to_file(path, content: str):
+    """
+    Prepend content to a file without reading the whole file into memory
+    
+    The content and then the original bytes are streamed into a sibling
+    ".part" file, which replaces the original in one os.replace, so readers
+    never see a half-written file. A symlink is followed, so the file it
+    points to is replaced and the link is kept.
+    
+    Args:
+        path: Existing file to modify
+        content: Text to insert at the start of the file, written as UTF-8
+    """
+    path = os.path.realpath(path)
+    part_path = path + '.part'
+    try:
+        with open(path, 'rb') as src, open(part_path, 'wb') as out:
+            out.write(content.encode('utf-8'))
+            shutil.copyfileobj(src, out, PREPEND_COPY_BUFFER)
+        shutil.copymode(path, part_path)
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _stamp_task(task_metadata: Dict[str, Any]) -> str:
+    """Give task metadata an ID if it has none and set its stored_at time"""
+    task_id = task_metadata.get("task_id", str(uuid.uuid4()))
+    task_metadata["task_id"] = task_id
+    task_metadata["stored_at"] = datetime.now().isoformat()
+    return task_id
 
 
 class TaskMetadataStore:
@@ -28,18 +143,31 @@ class TaskMetadataStore:
         self.base_dir = Path(base_dir)
         self.tasks_dir = self.base_dir / "tasks"
         self.tasks_dir.mkdir(parents=True, exist_ok=True)
+        # Recently stored or read tasks as {task_id: (file mtime_ns, JSON bytes)},
+        # least recently used first. The mtime catches writes by other stores
+        # over the same directory. Holding the file's bytes rather than a dict
+        # means callers always get their own copy and can never alter the cache.
+        self._cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        # Guards the cache for batches executed on several threads
+        self._cache_lock = threading.Lock()
         
+    def _remember(self, task_id: str, mtime_ns: int, payload: bytes):
+        """Cache a task's serialized metadata, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._cache[task_id] = (mtime_ns, payload)
+            self._cache.move_to_end(task_id)
+            if len(self._cache) > TASK_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
     def store_task(self, task_metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Store task metadata to filesystem"""
         try:
-            task_id = task_metadata.get("task_id", str(uuid.uuid4()))
-            task_metadata["task_id"] = task_id
-            task_metadata["stored_at"] = datetime.now().isoformat()
-            
+            task_id = _stamp_task(task_metadata)
             task_file = self.tasks_dir / f"{task_id}.json"
             
-            with open(task_file, 'w') as f:
-                json.dump(task_metadata, f, indent=2)
+            payload = json_dumps(task_metadata, indent=True)
+            mtime_ns = _write_file(task_file, payload)
+            self._remember(task_id, mtime_ns, payload)
             
             return {
                 "success": True,
@@ -55,23 +183,56 @@ class TaskMetadataStore:
     
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve task metadata by ID"""
+        payload = self._get_payload(task_id)
         try:
-            task_file = self.tasks_dir / f"{task_id}.json"
-            if task_file.exists():
-                with open(task_file, 'r') as f:
-                    return json.load(f)
-            return None
+            return json_loads(payload) if payload is not None else None
         except Exception:
             return None
     
+    def _get_payload(self, task_id: str) -> Optional[bytes]:
+        """Get a task's serialized metadata from the cache, reading the file on a miss"""
+        task_file = self.tasks_dir / f"{task_id}.json"
+        try:
+            mtime_ns = os.stat(task_file).st_mtime_ns
+        except OSError:
+            with self._cache_lock:
+                self._cache.pop(task_id, None)
+            return None
+        
+        with self._cache_lock:
+            cached = self._cache.get(task_id)
+            if cached is not None and cached[0] == mtime_ns:
+                self._cache.move_to_end(task_id)
+                return cached[1]
+        try:
+            with open(task_file, 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        self._remember(task_id, mtime_ns, payload)
+        return payload
+    
     def store_batch_tasks(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Store multiple tasks in batch"""
+        """Store multiple tasks in batch, writing their files on the IO pool"""
         try:
-            stored_tasks = []
-            for task in tasks:
-                result = self.store_task(task)
-                if result["success"]:
-                    stored_tasks.append(result["task_id"])
+            # Serialize everything up front; a task ID listed twice keeps its
+            # last metadata, as if the tasks had been stored one by one
+            task_ids = [_stamp_task(task) for task in tasks]
+            payloads = {task_id: json_dumps(task, indent=True) for task_id, task in zip(task_ids, tasks)}
+            futures = {
+                task_id: _IO_POOL.submit(_write_file, self.tasks_dir / f"{task_id}.json", payload)
+                for task_id, payload in payloads.items()
+            }
+            
+            written = set()
+            for task_id, future in futures.items():
+                try:
+                    mtime_ns = future.result()
+                except OSError:
+                    continue
+                self._remember(task_id, mtime_ns, payloads[task_id])
+                written.add(task_id)
+            stored_tasks = [task_id for task_id in task_ids if task_id in written]
             
             return {
                 "success": True,
@@ -88,6 +249,7 @@ class TaskMetadataStore:
     def update_task_status(self, task_id: str, status: str, **kwargs) -> Dict[str, Any]:
         """Update task execution status"""
         try:
+            # get_task returns a fresh dict, so a failed write leaves the cache as is
             task = self.get_task(task_id)
             if not task:
                 return {"success": False, "error": "Task not found"}
@@ -108,12 +270,165 @@ class TaskMetadataStore:
             }
 
 
+class TaskMetadataStoreSQLite:
+    """
+    Task metadata store that keeps every task in one SQLite database
+    
+    Same interface as TaskMetadataStore, without a file per task. The
+    database runs in WAL mode with synchronous=NORMAL, and a batch of
+    tasks is stored in a single transaction.
+    """
+    
+    def __init__(self, base_dir: str):
+        self.base_dir = Path(base_dir)
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.base_dir / "tasks.sqlite"
+        # Autocommit mode; batches open their own transaction
+        self.conn = sqlite3.connect(str(self.db_path), isolation_level=None,
+                                    check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, payload BLOB, updated_at REAL)"
+        )
+        # The connection is shared by every thread using this store
+        self._lock = threading.Lock()
+    
+    # Columns named, so databases created with an older schema still accept it
+    _UPSERT = "INSERT OR REPLACE INTO tasks (task_id, payload, updated_at) VALUES (?, ?, ?)"
+    
+    @staticmethod
+    def _row(task_id: str, task_metadata: Dict[str, Any]) -> tuple:
+        return (task_id, json_dumps(task_metadata), time.time())
+    
+    def store_task(self, task_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Store task metadata in the database"""
+        try:
+            task_id = _stamp_task(task_metadata)
+            with self._lock:
+                self.conn.execute(self._UPSERT, self._row(task_id, task_metadata))
+            
+            return {
+                "success": True,
+                "task_id": task_id,
+                "stored_file": str(self.db_path)
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Retrieve task metadata by ID"""
+        try:
+            with self._lock:
+                row = self.conn.execute("SELECT payload FROM tasks WHERE task_id = ?",
+                                        (task_id,)).fetchone()
+            return json_loads(row[0]) if row else None
+        except Exception:
+            return None
+    
+    def store_batch_tasks(self, tasks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Store multiple tasks in one transaction"""
+        try:
+            task_ids = [_stamp_task(task) for task in tasks]
+            rows = [self._row(task_id, task) for task_id, task in zip(task_ids, tasks)]
+            with self._lock:
+                self.conn.execute("BEGIN")
+                try:
+                    self.conn.executemany(self._UPSERT, rows)
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                self.conn.execute("COMMIT")
+            
+            return {
+                "success": True,
+                "tasks_stored": len(task_ids),
+                "task_ids": task_ids
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def update_task_status(self, task_id: str, status: str, **kwargs) -> Dict[str, Any]:
+        """Update task execution status"""
+        try:
+            # Read, modify and write under one lock hold, so concurrent
+            # updates of the same task cannot drop each other's fields
+            with self._lock:
+                self.conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self.conn.execute("SELECT payload FROM tasks WHERE task_id = ?",
+                                            (task_id,)).fetchone()
+                    if not row:
+                        self.conn.execute("ROLLBACK")
+                        return {"success": False, "error": "Task not found"}
+                    
+                    task = json_loads(row[0])
+                    task["status"] = status
+                    task["updated_at"] = datetime.now().isoformat()
+                    
+                    # Add any additional fields
+                    for key, value in kwargs.items():
+                        task[key] = value
+                    
+                    _stamp_task(task)
+                    self.conn.execute(self._UPSERT, self._row(task_id, task))
+                except Exception:
+                    self.conn.execute("ROLLBACK")
+                    raise
+                self.conn.execute("COMMIT")
+            
+            return {
+                "success": True,
+                "task_id": task_id,
+                "stored_file": str(self.db_path)
+            }
+            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+
+def create_task_store(base_dir: str, backend: Optional[str] = None):
+    """
+    Create the task metadata store for a directory
+    
+    Args:
+        base_dir: Directory holding the task metadata
+        backend: "json" or "sqlite"; defaults to the AGENT_TASK_STORE
+            environment variable, then "json"
+    
+    Returns:
+        TaskMetadataStore or TaskMetadataStoreSQLite
+    """
+    if backend is None:
+        backend = os.environ.get(TASK_STORE_ENV, "json")
+    backend = backend.lower()
+    if backend == "sqlite":
+        return TaskMetadataStoreSQLite(base_dir)
+    if backend != "json":
+        raise ValueError(f"Unknown task store backend: {backend}")
+    return TaskMetadataStore(base_dir)
+
+
 class TaskExecutorAgent:
     """Non-LLM agent that executes tasks based on stored metadata"""
     
     def __init__(self, base_dir: str):
         self.base_dir = Path(base_dir)
-        self.metadata_store = TaskMetadataStore(base_dir)
+        # Targets are joined onto this as plain strings, which is cheaper than Path /
+        self._base_dir_str = str(self.base_dir)
+        self.metadata_store = create_task_store(base_dir)
         self.execution_history = []
         
     def execute_task(self, task_id: str, enable_rollback: bool = False) -> Dict[str, Any]:
@@ -157,14 +472,18 @@ class TaskExecutorAgent:
                 "action": "error"
             }
     
+    def _target_path(self, target: str) -> str:
+        """Join a task target onto base_dir, normalized like a Path would be"""
+        return os.path.normpath(os.path.join(self._base_dir_str, target))
+    
     def _execute_file_creation(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Execute file creation from metadata"""
         try:
-            target_path = self.base_dir / task["target"]
+            target_path = self._target_path(task["target"])
             
             # Check if target path is valid for the OS
             try:
-                target_path.parent.mkdir(parents=True, exist_ok=True)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
             except (OSError, PermissionError) as e:
                 return {
                     "success": False,
@@ -178,7 +497,7 @@ class TaskExecutorAgent:
             return {
                 "success": True,
                 "action": "file_created",
-                "target": str(target_path),
+                "target": target_path,
                 "bytes_written": len(task["content"])
             }
             
@@ -192,9 +511,9 @@ class TaskExecutorAgent:
     def _execute_file_modification(self, task: Dict[str, Any]) -> Dict[str, Any]:
         """Execute file modification from metadata"""
         try:
-            target_path = self.base_dir / task["target"]
+            target_path = self._target_path(task["target"])
             
-            if not target_path.exists():
+            if not os.path.exists(target_path):
                 return {
                     "success": False,
                     "error": f"Target file {target_path} does not exist",
@@ -207,16 +526,13 @@ class TaskExecutorAgent:
                 with open(target_path, 'a') as f:
                     f.write(task["content"])
             elif modification_type == "prepend":
-                with open(target_path, 'r') as f:
-                    original = f.read()
-                with open(target_path, 'w') as f:
-                    f.write(task["content"] + original)
+                _prepend_to_file(target_path, task["content"])
             elif modification_type == "update_json":
-                with open(target_path, 'r') as f:
-                    data = json.load(f)
+                with open(target_path, 'rb') as f:
+                    data = json_loads(f.read())
                 data.update(task["content"])
-                with open(target_path, 'w') as f:
-                    json.dump(data, f, indent=2)
+                with open(target_path, 'wb') as f:
+                    f.write(json_dumps(data, indent=True))
             else:  # replace
                 with open(target_path, 'w') as f:
                     f.write(task["content"])
@@ -224,7 +540,7 @@ class TaskExecutorAgent:
             return {
                 "success": True,
                 "action": "file_modified",
-                "target": str(target_path),
+                "target": target_path,
                 "modification_type": modification_type
             }
             
@@ -235,21 +551,32 @@ class TaskExecutorAgent:
                 "action": "modification_failed"
             }
     
-    def execute_batch_tasks(self, task_ids: List[str]) -> Dict[str, Any]:
-        """Execute multiple tasks in sequence"""
+    def execute_batch_tasks(self, task_ids: List[str], parallel: bool = True,
+                            max_workers: int = 8) -> Dict[str, Any]:
+        """
+        Execute multiple tasks, on a thread pool unless parallel is False
+        
+        Tasks are file writes that release the GIL, so running them on
+        threads overlaps their I/O. Tasks with the same target file run
+        one after another on one thread, in the order given.
+        
+        Args:
+            task_ids: Tasks to execute
+            parallel: Run tasks for different targets concurrently
+            max_workers: Maximum number of threads
+        
+        Returns:
+            Dict with the success and failure counts and per-task results
+            in task_ids order
+        """
         try:
-            results = []
-            succeeded = 0
-            failed = 0
+            if parallel and len(task_ids) > 1:
+                results = self._execute_grouped_by_target(task_ids, max_workers)
+            else:
+                results = [self.execute_task(task_id) for task_id in task_ids]
             
-            for task_id in task_ids:
-                result = self.execute_task(task_id)
-                results.append(result)
-                
-                if result["success"]:
-                    succeeded += 1
-                else:
-                    failed += 1
+            succeeded = sum(1 for result in results if result["success"])
+            failed = len(results) - succeeded
             
             return {
                 "success": True,
@@ -264,6 +591,30 @@ class TaskExecutorAgent:
                 "error": str(e)
             }
     
+    def _execute_grouped_by_target(self, task_ids: List[str], max_workers: int) -> List[Dict[str, Any]]:
+        """Execute tasks grouped by target file, one thread per group at a time"""
+        # Positions in task_ids of the tasks for each target
+        groups: Dict[Any, List[int]] = {}
+        for i, task_id in enumerate(task_ids):
+            task = self.metadata_store.get_task(task_id)
+            if task and "target" in task:
+                key = os.path.normcase(self._target_path(task["target"]))
+            else:
+                # Fails in execute_task; keep repeats of the ID together
+                key = ("task", task_id)
+            groups.setdefault(key, []).append(i)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(task_ids)
+        
+        def run_group(positions: List[int]):
+            for i in positions:
+                results[i] = self.execute_task(task_ids[i])
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as pool:
+            # list() surfaces any exception raised in a worker
+            list(pool.map(run_group, groups.values()))
+        return results
+    
     def _rollback_operation(self, task_id: str):
         """Rollback a failed operation"""
         # Implementation for rollback logic
@@ -271,6 +622,19 @@ class TaskExecutorAgent:
         print(f"Rolling back task {task_id}")
 
 
+def _is_complete_plan(plan: Any) -> bool:
+    """Check that a plan has the keys StructuredTaskProcessor reads from it"""
+    if not isinstance(plan, dict) or "task_type" not in plan:
+        return False
+    if plan["task_type"] == "multi_file_creation":
+        tasks = plan.get("tasks")
+        return isinstance(tasks, list) and all(
+            isinstance(task, dict) and "target_file" in task and "content" in task
+            for task in tasks
+        )
+    return "target_file" in plan and "content" in plan
+
+
 class LLMPlannerAgent:
     """LLM agent that generates structured task metadata"""
     
@@ -279,11 +643,25 @@ class LLMPlannerAgent:
         self.cost_tracker = {
             "total_calls": 0,
             "total_tokens": 0,
-            "total_cost": 0.0
+            "total_cost": 0.0,
+            "cache_hits": 0
         }
+        # Plans by BLAKE2b digest of the exact request, least recently used first
+        self._plan_cache: "OrderedDict[bytes, Any]" = OrderedDict()
     
     def create_execution_plan(self, user_request: str) -> Dict[str, Any]:
-        """Generate structured execution plan using LLM"""
+        """Generate structured execution plan using LLM, reusing plans for repeated requests"""
+        key = hashlib.blake2b(user_request.encode("utf-8"), digest_size=16).digest()
+        if key in self._plan_cache:
+            self._plan_cache.move_to_end(key)
+            self.cost_tracker["cache_hits"] += 1
+            return {
+                "success": True,
+                # A copy, so callers cannot change the cached plan
+                "plan": copy.deepcopy(self._plan_cache[key]),
+                "cost_used": False
+            }
+        
         try:
             # Use LLM to generate structured plan
             prompt = f"""
@@ -314,6 +692,13 @@ class LLMPlannerAgent:
             # Track costs
             self.cost_tracker["total_calls"] += 1
             
+            # Only cache plans StructuredTaskProcessor can act on, so a
+            # malformed response is retried instead of served again
+            if _is_complete_plan(response):
+                self._plan_cache[key] = copy.deepcopy(response)
+                if len(self._plan_cache) > PLAN_CACHE_SIZE:
+                    self._plan_cache.popitem(last=False)
+            
             return {
                 "success": True,
                 "plan": response,
@@ -333,13 +718,15 @@ class LLMPlannerAgent:
             return {
                 "total_tokens": stats.get("tokens_used", 0),
                 "estimated_total_cost": stats.get("estimated_cost", 0.0),
-                "llm_calls": self.cost_tracker["total_calls"]
+                "llm_calls": self.cost_tracker["total_calls"],
+                "plan_cache_hits": self.cost_tracker["cache_hits"]
             }
         else:
             return {
                 "total_tokens": 0,
                 "estimated_total_cost": 0.0,
-                "llm_calls": self.cost_tracker["total_calls"]
+                "llm_calls": self.cost_tracker["total_calls"],
+                "plan_cache_hits": self.cost_tracker["cache_hits"]
             }
 
 
@@ -350,7 +737,8 @@ class StructuredTaskProcessor:
         self.base_dir = base_dir
         self.llm_planner = LLMPlannerAgent(llm_model) if llm_model else None
         self.task_executor = TaskExecutorAgent(base_dir)
-        self.metadata_store = TaskMetadataStore(base_dir)
+        # Share the executor's store so both see the same cached task metadata
+        self.metadata_store = self.task_executor.metadata_store
         
         self.stats = {
             "total_requests": 0,
@@ -368,7 +756,9 @@ class StructuredTaskProcessor:
             if needs_llm and self.llm_planner:
                 # Use LLM for planning
                 plan_result = self.llm_planner.create_execution_plan(user_request)
-                self.stats["llm_requests"] += 1
+                # A plan served from the planner's cache made no LLM call
+                if plan_result.get("cost_used"):
+                    self.stats["llm_requests"] += 1
                 
                 if not plan_result["success"]:
                     return plan_result
@@ -457,31 +847,12 @@ class StructuredTaskProcessor:
         if "create" in request_lower and "javascript" in request_lower:
             return False
         
-        # Simple keywords that can be handled without LLM
-        simple_keywords = [
-            "create simple", "make basic", "add file", "simple html", "basic file", "standard config", 
-            "update config", "modify json", "index.html", "config.json", "css file"
-        ]
-        
-        # Creative/complex keywords that need LLM
-        creative_keywords = [
-            "creative", "story", "narrative", "unique", "design", 
-            "algorithm", "complex", "generate", "innovative", "engaging",
-            "game narrative", "ai algorithm", "pathfinding"
-        ]
-        
         # Check for creative/complex content first (higher priority)
-        for keyword in creative_keywords:
-            if keyword in request_lower:
-                return True
+        if _CREATIVE_KEYWORDS_RE.search(request_lower):
+            return True
         
         # Check for simple operations
-        for keyword in simple_keywords:
-            if keyword in request_lower:
-                return False
-        
-        # For test cases
-        if "html file" in request_lower:
+        if _SIMPLE_KEYWORDS_RE.search(request_lower):
             return False
         
         # Default: use LLM for uncertain cases
@@ -493,22 +864,10 @@ class StructuredTaskProcessor:
         request_lower = request.lower()
         
         if "create" in request_lower and "html" in request_lower:
-            content = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Document</title>
-</head>
-<body>
-    <h1>Hello World</h1>
-</body>
-</html>"""
-            
             task_metadata = {
                 "type": "file_creation",
                 "target": "index.html",
-                "content": content,
+                "content": _DEFAULT_HTML_TEMPLATE,
                 "status": "pending"
             }
             
@@ -559,25 +918,88 @@ class TaskMemory:
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         self.plans_dir = self.memory_dir / "reusable_plans"
         self.plans_dir.mkdir(parents=True, exist_ok=True)
+        # Plan file for each pattern, and the plans_dir mtime it was built at.
+        # Adding or removing a plan file changes that mtime.
+        self._pattern_index: Dict[str, Path] = {}
+        self._plans_mtime: Optional[int] = None
+        self._refresh_pattern_index()
+    
+    def _refresh_pattern_index(self, force: bool = False):
+        """Rebuild the pattern index if plans_dir changed since it was built"""
+        mtime_ns = os.stat(self.plans_dir).st_mtime_ns
+        if not force and mtime_ns == self._plans_mtime:
+            return
+        
+        index = {}
+        for plan_file in sorted(self.plans_dir.glob("*.json")):
+            try:
+                with open(plan_file, 'rb') as f:
+                    plan = json_loads(f.read())
+            except Exception:
+                continue
+            index.setdefault(plan.get("pattern"), plan_file)
+        self._pattern_index = index
+        self._plans_mtime = mtime_ns
+    
+    def _session_file(self, session_id: str, convert: bool = True) -> Path:
+        """
+        Get the JSON Lines history file for a session
+        
+        A history saved by older versions as one JSON array in
+        session_<id>.json is converted when convert is set. The new file is
+        written beside it and moved into place with os.replace, and the old
+        file is kept as session_<id>.json.bak.
+        """
+        session_file = self.memory_dir / f"session_{session_id}.jsonl"
+        legacy_file = self._legacy_session_file(session_id)
+        if convert and legacy_file.exists() and not session_file.exists():
+            with open(legacy_file, 'rb') as f:
+                history = json_loads(f.read())
+            part_file = session_file.with_name(session_file.name + '.part')
+            with open(part_file, 'wb') as f:
+                f.writelines(json_dumps(record) + b"\n" for record in history)
+            os.replace(part_file, session_file)
+            os.replace(legacy_file, legacy_file.with_name(legacy_file.name + '.bak'))
+        return session_file
+    
+    def _legacy_session_file(self, session_id: str) -> Path:
+        """Get the single-array history file older versions wrote for a session"""
+        return self.memory_dir / f"session_{session_id}.json"
+    
+    def _read_session(self, session_file: Path) -> List[Tuple[int, Dict[str, Any]]]:
+        """Read a session's records, each with the file offset where its line ends"""
+        if not session_file.exists():
+            return []
+        with open(session_file, 'rb') as f:
+            data = f.read()
+        
+        records = []
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            offset += len(line)
+            try:
+                records.append((offset, json_loads(line)))
+            except ValueError:
+                # A line cut short by an interrupted write
+                continue
+        return records
     
     def store_execution(self, execution_record: Dict[str, Any]) -> Dict[str, Any]:
         """Store execution history"""
         try:
-            session_id = execution_record["session_id"]
-            session_file = self.memory_dir / f"session_{session_id}.json"
+            session_file = self._session_file(execution_record["session_id"])
+            line = json_dumps(execution_record) + b"\n"
             
-            # Load existing history
-            history = []
-            if session_file.exists():
-                with open(session_file, 'r') as f:
-                    history = json.load(f)
-            
-            # Add new record
-            history.append(execution_record)
-            
-            # Save updated history
-            with open(session_file, 'w') as f:
-                json.dump(history, f, indent=2)
+            # One line per record, so storing never rewrites earlier records
+            with open(session_file, 'a+b') as f:
+                # End a line cut short by an interrupted write first, so the
+                # new record is not glued onto it
+                end = f.seek(0, os.SEEK_END)
+                if end:
+                    f.seek(end - 1)
+                    if f.read(1) != b"\n":
+                        line = b"\n" + line
+                f.write(line)
             
             return {"success": True}
             
@@ -587,41 +1009,41 @@ class TaskMemory:
     def get_session_history(self, session_id: str) -> List[Dict[str, Any]]:
         """Get execution history for a session"""
         try:
-            session_file = self.memory_dir / f"session_{session_id}.json"
-            if session_file.exists():
-                with open(session_file, 'r') as f:
-                    return json.load(f)
-            return []
+            # Reading leaves a legacy history as it is; the next write converts it
+            session_file = self._session_file(session_id, convert=False)
+            if not session_file.exists():
+                legacy_file = self._legacy_session_file(session_id)
+                if legacy_file.exists():
+                    with open(legacy_file, 'rb') as f:
+                        return json_loads(f.read())
+            return [record for _, record in self._read_session(session_file)]
         except Exception:
             return []
     
     def rollback_to_state(self, session_id: str, target_task_id: str) -> Dict[str, Any]:
         """Rollback to a previous execution state"""
         try:
-            history = self.get_session_history(session_id)
+            session_file = self._session_file(session_id)
+            history = self._read_session(session_file)
             
             # Find target state index
             target_index = -1
-            for i, record in enumerate(history):
-                if record["task_id"] == target_task_id:
+            for i, (_, record) in enumerate(history):
+                if record.get("task_id") == target_task_id:
                     target_index = i
                     break
             
             if target_index == -1:
                 return {"success": False, "error": "Target state not found"}
             
-            # Truncate history to target state
-            truncated_history = history[:target_index + 1]
-            
-            # Save truncated history
-            session_file = self.memory_dir / f"session_{session_id}.json"
-            with open(session_file, 'w') as f:
-                json.dump(truncated_history, f, indent=2)
+            # Truncate history right after the target state's line
+            with open(session_file, 'r+b') as f:
+                f.truncate(history[target_index][0])
             
             return {
                 "success": True,
                 "rolled_back_to": target_task_id,
-                "states_removed": len(history) - len(truncated_history)
+                "states_removed": len(history) - (target_index + 1)
             }
             
         except Exception as e:
@@ -633,8 +1055,13 @@ class TaskMemory:
             plan_id = plan["plan_id"]
             plan_file = self.plans_dir / f"{plan_id}.json"
             
-            with open(plan_file, 'w') as f:
-                json.dump(plan, f, indent=2)
+            # Pick up plans written by others first, so the index stays
+            # complete once it takes the mtime after our own write
+            self._refresh_pattern_index()
+            with open(plan_file, 'wb') as f:
+                f.write(json_dumps(plan, indent=True))
+            self._pattern_index[plan.get("pattern")] = plan_file
+            self._plans_mtime = os.stat(self.plans_dir).st_mtime_ns
             
             return {"success": True}
             
@@ -644,11 +1071,21 @@ class TaskMemory:
     def get_reusable_plan(self, pattern: str) -> Optional[Dict[str, Any]]:
         """Get a reusable plan by pattern"""
         try:
-            for plan_file in self.plans_dir.glob("*.json"):
-                with open(plan_file, 'r') as f:
-                    plan = json.load(f)
+            self._refresh_pattern_index()
+            for attempt in range(2):
+                plan_file = self._pattern_index.get(pattern)
+                if plan_file is None:
+                    return None
+                try:
+                    with open(plan_file, 'rb') as f:
+                        plan = json_loads(f.read())
                     if plan.get("pattern") == pattern:
                         return plan
+                except (OSError, ValueError):
+                    pass
+                # The file was rewritten with another pattern or removed
+                # in place; rescan once
+                self._refresh_pattern_index(force=True)
             return None
         except Exception:
             return None
@@ -660,12 +1097,13 @@ class TaskMemory:
             return None
         
         template = plan["template"].copy()
+        if not variables:
+            return template
         
-        # Replace variables in template
+        # Replace every {var_name} placeholder in one pass per string value
+        placeholder = re.compile(r"\{(" + "|".join(map(re.escape, variables)) + r")\}")
         for key, value in template.items():
             if isinstance(value, str):
-                for var_name, var_value in variables.items():
-                    value = value.replace(f"{{{var_name}}}", var_value)
-                template[key] = value
+                template[key] = placeholder.sub(lambda match: variables[match.group(1)], value)
         
         return template
@@ -0,0 +1,476 @@
+"""
+On-disk cache for the codebase vector store.
+This module persists the FAISS index between runs and only re-embeds files
+whose content changed since the last run. Modification time and size are
+checked first; the content hash is only computed for files whose stat changed.
+Chunk embeddings are cached too, so an edited file only re-embeds the chunks
+whose text changed, and a rebuilt index reuses every unchanged vector.
+An index that needs no update is memory-mapped read-only instead of read
+into memory.
+"""
+
+from langchain_community.vectorstores import FAISS
+from langchain.embeddings.base import Embeddings
+from langchain.schema import Document
+import hashlib
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import logging
+import pickle
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+from .code_embedding import (
+    DEFAULT_EXTENSIONS,
+    MAX_FILE_BYTES,
+    build_vector_store,
+    create_embeddings,
+    create_text_splitter,
+    read_files,
+    resolve_code_dir,
+    split_documents,
+    move_index_to_gpu,
+    resolve_tasks_path,
+    vector_store_options
+)
+from .embedding_local import CODE_EMBEDDINGS_MODEL
+from .fastwalk import iter_source_files
+
+logger = logging.getLogger(__name__)
+
+# Root directory for all cached vector stores (relative to the working directory)
+CACHE_ROOT = ".agent_cache"
+MANIFEST_FILE = "manifest.json"
+INDEX_DIR = "index"
+QUERY_CACHE_PATTERN = "qcache_k*.sqlite"
+CHUNK_CACHE_FILE = "chunks.sqlite"
+
+# Digests per SELECT, below SQLite's limit on bound parameters
+_LOOKUP_BATCH = 500
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that stores each chunk's vector in SQLite, keyed by a
+    BLAKE2b digest of the chunk text, and only embeds texts it has not seen
+    """
+
+    def __init__(self, embeddings, db_path):
+        """
+        Initialize the cache
+
+        Args:
+            embeddings: Embeddings instance that computes missing vectors
+            db_path: Path of the SQLite file backing the cache
+        """
+        self.embeddings = embeddings
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors (digest BLOB PRIMARY KEY, embedding BLOB)"
+        )
+        # Digests requested since the cache was opened, for prune()
+        self._used = set()
+
+    @staticmethod
+    def _digest(text):
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed_documents(self, texts):
+        """Return cached vectors, embedding the missing texts in one call"""
+        digests = [self._digest(text) for text in texts]
+        self._used.update(digests)
+
+        found = {}
+        unique = list(set(digests))
+        for start in range(0, len(unique), _LOOKUP_BATCH):
+            batch = unique[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            for digest, blob in self.conn.execute(
+                    f"SELECT digest, embedding FROM vectors WHERE digest IN ({placeholders})", batch):
+                found[digest] = np.frombuffer(blob, dtype=np.float32).tolist()
+
+        missing = {}
+        for digest, text in zip(digests, texts):
+            if digest not in found:
+                missing.setdefault(digest, text)
+        if missing:
+            # sentence-transformers sorts each call's texts by length into batches
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            rows = []
+            for digest, vector in zip(missing, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                found[digest] = vector.tolist()
+                rows.append((digest, vector.tobytes()))
+            self.conn.executemany("INSERT OR REPLACE INTO vectors VALUES (?, ?)", rows)
+            self.conn.commit()
+
+        logger.info(f"Chunk embeddings: {len(texts) - len(missing)} cached, {len(missing)} computed")
+        return [found[digest] for digest in digests]
+
+    def embed_query(self, text):
+        """Queries are not cached"""
+        return self.embeddings.embed_query(text)
+
+    def embed_queries(self, texts):
+        """Embed several queries in one call, without caching them"""
+        return self.embeddings.embed_documents(texts)
+
+    def prune(self):
+        """Drop vectors of chunks that were not requested since the cache was opened"""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS used (digest BLOB PRIMARY KEY)")
+        self.conn.execute("DELETE FROM used")
+        self.conn.executemany("INSERT OR IGNORE INTO used VALUES (?)", ((d,) for d in self._used))
+        self.conn.execute("DELETE FROM vectors WHERE digest NOT IN (SELECT digest FROM used)")
+        self.conn.commit()
+
+def _embedding_model_name(config):
+    """
+    Name of the embedding model, used to invalidate the cache when it changes
+
+    Read from the same settings create_embeddings uses to pick the model.
+    llm.embedding_model does not pick it, so it is only appended.
+    """
+    rag_config = config.get("rag", {})
+    if rag_config.get("embeddings_provider", "local") == "code":
+        name = CODE_EMBEDDINGS_MODEL
+    else:
+        name = rag_config.get("local_embeddings_model", "all-MiniLM-L6-v2")
+    extra = config.get("llm", {}).get("embedding_model")
+    return f"{name}+{extra}" if extra else name
+
+def get_cache_dir(config, code_dir):
+    """
+    Get the cache directory for a code directory and embedding model
+
+    Args:
+        config (dict): Configuration dictionary
+        code_dir (str): Absolute path of the code directory
+
+    Returns:
+        str: Path of the cache directory
+    """
+    rag_config = config.get("rag", {})
+    parts = [
+        code_dir,
+        _embedding_model_name(config),
+        str(rag_config.get("chunk_size", 1000)),
+        str(rag_config.get("chunk_overlap", 100))
+    ]
+    # Token-measured chunks differ from character-measured ones of the same size
+    if rag_config.get("chunk_unit", "chars") == "tokens":
+        parts.append("tokens:" + rag_config.get("tokenizer", "cl100k_base"))
+    # Flat indexes keep the key they had before index_type existed
+    index_type = rag_config.get("index_type", "flat")
+    if index_type != "flat":
+        parts.append(index_type)
+    if rag_config.get("quantize", False):
+        parts.append("sq8")
+    metric = rag_config.get("metric", "l2")
+    if metric != "l2":
+        parts.append(metric)
+    # Reduced-precision models produce slightly different vectors
+    precision = rag_config.get("precision", "fp32")
+    if precision != "fp32":
+        parts.append(precision)
+    key = "|".join(parts)
+    return os.path.join(CACHE_ROOT, hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+def get_query_cache_path(config, code_dir):
+    """
+    Get the path of the query cache that belongs to a cached vector store
+
+    Args:
+        config (dict): Configuration dictionary
+        code_dir (str): Directory containing the code
+
+    Returns:
+        str: Path of the SQLite query cache file
+    """
+    k = config.get("rag", {}).get("similarity_top_k", 3)
+    return os.path.join(get_cache_dir(config, resolve_code_dir(code_dir)), f"qcache_k{k}.sqlite")
+
+def _clear_query_caches(cache_dir):
+    """Drop cached query results, which are stale once the index changes"""
+    for path in glob.glob(os.path.join(cache_dir, QUERY_CACHE_PATTERN)):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"Could not remove stale query cache {path}: {e}")
+
+def build_manifest(code_dir, file_extensions, tasks_path=None, max_bytes=None):
+    """
+    Build a manifest of the files that would be embedded
+
+    Args:
+        code_dir (str): Absolute path of the code directory
+        file_extensions (Iterable[str]): File extensions to include
+        tasks_path (str, optional): Path of the tasks file to include
+        max_bytes (int, optional): Skip code files larger than this
+
+    Returns:
+        dict: Mapping of file path to [mtime_ns, size]
+    """
+    manifest = {}
+
+    for entry in iter_source_files(code_dir, file_extensions, max_bytes):
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        manifest[entry.path] = [st.st_mtime_ns, st.st_size]
+
+    if tasks_path is not None:
+        try:
+            st = os.stat(tasks_path)
+            manifest[tasks_path] = [st.st_mtime_ns, st.st_size]
+        except OSError:
+            pass
+
+    return manifest
+
+def _content_hash(content):
+    """Digest of a file's text, used to tell real edits from touched files"""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+def load_chunks(paths, text_splitter, known_hashes=None):
+    """
+    Read and split the given files into chunks with stable ids
+
+    Files whose content hash equals the one in known_hashes are not split;
+    they appear in hashes but not in ids_by_path. Binary files get no chunks
+    and no hash, so they stay in the manifest without being read again.
+
+    Args:
+        paths (Iterable[str]): Files to read
+        text_splitter: Splitter from create_text_splitter
+        known_hashes (dict, optional): Content hash per path from an earlier run
+
+    Returns:
+        tuple: (chunks, ids_by_path, hashes), where chunk ids are "<path>#<n>"
+    """
+    chunks = []
+    ids_by_path = {}
+    hashes = {}
+    documents = []
+    known_hashes = known_hashes or {}
+
+    for file_path, content in read_files(paths):
+        if isinstance(content, Exception):
+            print(f"Error loading file {file_path}: {content}")
+            continue
+        if content is None:
+            logger.debug(f"Skipping binary file: {file_path}")
+            hashes[file_path] = None
+            ids_by_path[file_path] = []
+            continue
+
+        hashes[file_path] = _content_hash(content)
+        if known_hashes.get(file_path) == hashes[file_path]:
+            continue
+
+        documents.append(Document(page_content=content, metadata={"source": file_path}))
+        logger.debug(f"Loaded file: {file_path}")
+
+    for doc, file_chunks in zip(documents, split_documents(text_splitter, documents)):
+        file_path = doc.metadata["source"]
+        ids_by_path[file_path] = [f"{file_path}#{i}" for i in range(len(file_chunks))]
+        chunks.extend(file_chunks)
+
+    return chunks, ids_by_path, hashes
+
+def _read_manifest(cache_dir):
+    """Load the stored manifest, or None on a miss"""
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not (os.path.exists(manifest_path) and os.path.isdir(os.path.join(cache_dir, INDEX_DIR))):
+        return None
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable embedding cache at {cache_dir}: {e}")
+        return None
+
+def _read_index(cache_dir, embeddings, options, mmap=False):
+    """
+    Load the stored vector store, or None if it cannot be read
+
+    Args:
+        cache_dir (str): Cache directory of the vector store
+        embeddings: Embedding model for queries
+        options (dict): Distance settings, which are not saved with the index
+        mmap (bool): Map the index read-only instead of reading it into memory;
+            pages are loaded on demand and shared between processes
+
+    Returns:
+        FAISS: Vector store, or None
+    """
+    index_path = os.path.join(cache_dir, INDEX_DIR)
+    try:
+        if not mmap or faiss is None:
+            return FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True,
+                                    **options)
+        # Older FAISS versions only map IVF lists; IO_FLAG_MMAP_IFC maps every index's codes
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        index = faiss.read_index(os.path.join(index_path, "index.faiss"), flags)
+        with open(os.path.join(index_path, "index.pkl"), 'rb') as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return FAISS(embeddings, index, docstore, index_to_docstore_id, **options)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable embedding cache at {cache_dir}: {e}")
+        return None
+
+def _write_manifest(cache_dir, files):
+    """Persist the manifest alone, for changes that leave the index as it is"""
+    with open(os.path.join(cache_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump({"files": files}, f)
+
+def _write_cache(cache_dir, files, db):
+    """Persist the manifest and vector store"""
+    os.makedirs(cache_dir, exist_ok=True)
+    _clear_query_caches(cache_dir)
+    # Save next to the index and swap the files in, so another process that
+    # has the old index mapped keeps reading the old file instead of a
+    # truncated one
+    index_path = os.path.join(cache_dir, INDEX_DIR)
+    staging_path = index_path + ".tmp"
+    db.save_local(staging_path)
+    os.makedirs(index_path, exist_ok=True)
+    for name in os.listdir(staging_path):
+        os.replace(os.path.join(staging_path, name), os.path.join(index_path, name))
+    os.rmdir(staging_path)
+    _write_manifest(cache_dir, files)
+
+def _build_cache(config, cache_dir, manifest, embeddings, text_splitter):
+    """Cold start: embed every file in the manifest and persist the result"""
+    chunks, ids_by_path, hashes = load_chunks(manifest, text_splitter)
+    if not chunks:
+        print("Warning: No documents loaded!")
+        return None
+    ids = [chunk_id for path in ids_by_path for chunk_id in ids_by_path[path]]
+    db = build_vector_store(chunks, embeddings, config, ids=ids)
+    # Every current chunk was just embedded; anything else in the cache is stale
+    embeddings.prune()
+    files = {path: {"stat": manifest[path], "hash": hashes[path], "ids": ids_by_path[path]}
+             for path in ids_by_path}
+    _write_cache(cache_dir, files, db)
+    print(f"Embedded {len(files)} files into {len(chunks)} chunks (cached in {cache_dir})")
+    return db
+
+def load_or_build_db(config, code_dir="project-code", file_extensions=None, tasks_file="tasks.md"):
+    """
+    Load the codebase vector store from the disk cache, re-embedding only changed files
+
+    The cache is updated on the CPU; the returned store searches on the GPU
+    when one is available (see move_index_to_gpu).
+
+    Args:
+        config (dict): Configuration dictionary
+        code_dir (str): Directory containing the code to embed
+        file_extensions (Iterable[str]): File extensions to include
+        tasks_file (str): Filename of the tasks file
+
+    Returns:
+        FAISS: Vector store with embedded documents, or None if nothing was found
+    """
+    db = _load_or_build_db(config, code_dir, file_extensions, tasks_file)
+    return move_index_to_gpu(db, config)
+
+def _load_or_build_db(config, code_dir, file_extensions, tasks_file):
+    """Load or update the cached vector store on the CPU"""
+    print(f"Loading and embedding codebase from {code_dir}...")
+
+    code_dir = resolve_code_dir(code_dir)
+    if file_extensions is None:
+        file_extensions = DEFAULT_EXTENSIONS
+
+    tasks_path = resolve_tasks_path(tasks_file)
+    if tasks_path is None:
+        print(f"Warning: Could not find tasks file: {tasks_file}")
+
+    manifest = build_manifest(code_dir, file_extensions, tasks_path,
+                              config.get("rag", {}).get("max_file_bytes", MAX_FILE_BYTES))
+    cache_dir = get_cache_dir(config, code_dir)
+
+    if not manifest:
+        print("Warning: No documents loaded!")
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return None
+
+    embeddings = CachedEmbeddings(create_embeddings(config), os.path.join(cache_dir, CHUNK_CACHE_FILE))
+    text_splitter = create_text_splitter(config)
+    options = vector_store_options(config)
+    stored = _read_manifest(cache_dir)
+
+    if stored is None:
+        return _build_cache(config, cache_dir, manifest, embeddings, text_splitter)
+
+    files = stored.get("files", {})
+    changed = [path for path, stat in manifest.items()
+               if path not in files or files[path]["stat"] != stat]
+    removed = [path for path in files if path not in manifest]
+
+    if not changed and not removed:
+        # Nothing will be added or removed, so the index can stay on disk
+        db = _read_index(cache_dir, embeddings, options, mmap=True)
+        if db is None:
+            return _build_cache(config, cache_dir, manifest, embeddings, text_splitter)
+        print(f"Embedding cache hit: {len(files)} files unchanged")
+        return db
+
+    # Files whose stat changed but whose content did not (touched, checked out
+    # again) keep their chunks; only the stored stat is refreshed
+    known_hashes = {path: files[path].get("hash") for path in changed if path in files}
+    chunks, ids_by_path, hashes = load_chunks(changed, text_splitter, known_hashes)
+    touched = [path for path in hashes if path not in ids_by_path]
+    for path in touched:
+        files[path]["stat"] = manifest[path]
+    if touched:
+        changed = [path for path in changed if path not in hashes or path in ids_by_path]
+
+    if not changed and not removed:
+        db = _read_index(cache_dir, embeddings, options, mmap=True)
+        if db is None:
+            return _build_cache(config, cache_dir, manifest, embeddings, text_splitter)
+        _write_manifest(cache_dir, files)
+        print(f"Embedding cache hit: {len(files)} files, {len(touched)} touched but unchanged")
+        return db
+
+    db = _read_index(cache_dir, embeddings, options)
+    if db is None:
+        return _build_cache(config, cache_dir, manifest, embeddings, text_splitter)
+
+    stale_ids = [chunk_id for path in changed + removed if path in files
+                 for chunk_id in files[path]["ids"]]
+
+    if len(stale_ids) >= db.index.ntotal and not chunks:
+        # Everything was removed; FAISS cannot hold an empty index cleanly
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        print("Warning: No documents loaded!")
+        return None
+
+    if stale_ids:
+        try:
+            db.delete(ids=stale_ids)
+        except RuntimeError:
+            # Graph indexes (rag.index_type "hnsw") cannot remove vectors
+            print("Index does not support removal; rebuilding it")
+            return _build_cache(config, cache_dir, manifest, embeddings, text_splitter)
+    if chunks:
+        db.add_documents(chunks, ids=[chunk_id for path in ids_by_path for chunk_id in ids_by_path[path]])
+
+    for path in changed + removed:
+        files.pop(path, None)
+    for path, chunk_ids in ids_by_path.items():
+        files[path] = {"stat": manifest[path], "hash": hashes[path], "ids": chunk_ids}
+
+    _write_cache(cache_dir, files, db)
+    print(f"Embedding cache updated: {len(changed)} changed, {len(removed)} removed")
+    return db
@@ -4,6 +4,7 @@ Provides an alternative to OpenAI embeddings for offline/local usage.
 """
 
 import os
+import threading
 import numpy as np
 from typing import List, Dict, Any, Optional
 from langchain.embeddings.base import Embeddings
@@ -13,27 +14,57 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model used by CodeEmbeddings (rag.embeddings_provider "code")
+CODE_EMBEDDINGS_MODEL = "microsoft/codebert-base"
+
+# Loaded models shared by every LocalEmbeddings in the process:
+# {(model_name, cache_folder, precision): model}
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
 class LocalEmbeddings(Embeddings):
     """
     Local embeddings using Sentence Transformers.
     Compatible with LangChain's Embeddings interface.
     """
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_folder: Optional[str] = None):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", cache_folder: Optional[str] = None,
+                 batch_size: int = 32, precision: str = "fp32"):
         """
         Initialize local embeddings
         
         Args:
             model_name: Sentence transformer model name
             cache_folder: Directory to cache models (optional)
+            batch_size: Number of texts encoded per forward pass
+            precision: Weight precision for inference: "fp32", "fp16" or "int8"
         """
+        if precision not in ("fp32", "fp16", "int8"):
+            raise ValueError(f"Unknown embedding precision: {precision}")
         self.model_name = model_name
+        self.batch_size = batch_size
+        self.precision = precision
         self.cache_folder = cache_folder or os.path.join(os.getcwd(), ".cache", "sentence-transformers")
         self.model = None
         self._load_model()
     
     def _load_model(self):
-        """Load the sentence transformer model"""
+        """
+        Load the sentence transformer model
+        
+        The weights are loaded once per process; later instances with the same
+        model, cache folder and precision reuse the loaded model.
+        """
+        key = (self.model_name, self.cache_folder, self.precision)
+        with _MODELS_LOCK:
+            if key in _MODELS:
+                self.model = _MODELS[key]
+                return
+            self._load_new_model()
+            _MODELS[key] = self.model
+    
+    def _load_new_model(self):
+        """Read the model weights from disk (or download them)"""
         try:
             from sentence_transformers import SentenceTransformer
             
@@ -45,6 +76,8 @@ class LocalEmbeddings(Embeddings):
                 self.model_name, 
                 cache_folder=self.cache_folder
             )
+            if self.precision != "fp32":
+                self._reduce_precision()
             logger.info(f"✅ Local embedding model loaded successfully")
             
         except ImportError:
@@ -56,6 +89,29 @@ class LocalEmbeddings(Embeddings):
             logger.error(f"Error loading model {self.model_name}: {e}")
             raise
     
+    def _reduce_precision(self):
+        """
+        Convert the loaded model to half precision or int8 weights
+        
+        fp16 uses float16 on GPUs and bfloat16 on CPUs, where float16 matrix
+        products are slow. int8 applies PyTorch dynamic quantization to the
+        linear layers and runs on the CPU only.
+        """
+        import torch
+        
+        if self.precision == "fp16":
+            if self.model.device.type == "cuda":
+                self.model.half()
+            else:
+                self.model.to(torch.bfloat16)
+        elif self.model.device.type == "cpu":
+            self.model = torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        else:
+            logger.warning("int8 embeddings run on the CPU only; keeping fp32 weights")
+        logger.info(f"Embedding model running at {self.precision} precision")
+    
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
         Embed a list of documents
@@ -71,7 +127,7 @@ class LocalEmbeddings(Embeddings):
             
         try:
             # Generate embeddings
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
+            embeddings = self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
             
             # Convert to list of lists for compatibility
             return embeddings.tolist()
@@ -108,11 +164,14 @@ class CodeEmbeddings(LocalEmbeddings):
     Uses a model optimized for code understanding.
     """
     
-    def __init__(self, cache_folder: Optional[str] = None):
+    def __init__(self, cache_folder: Optional[str] = None, batch_size: int = 32,
+                 precision: str = "fp32"):
         # Use a model better suited for code
         super().__init__(
-            model_name="microsoft/codebert-base", 
-            cache_folder=cache_folder
+            model_name=CODE_EMBEDDINGS_MODEL, 
+            cache_folder=cache_folder,
+            batch_size=batch_size,
+            precision=precision
         )
 
 def get_available_models():
@@ -6,11 +6,14 @@ functionality, automatic file type detection, and advanced features.
 """
 
 import os
+from glob import glob
 from pathlib import Path
 import re
 import json
 from typing import Dict, Any, List, Optional, Tuple, Union
 
+from .fastwalk import iter_entries
+
 def detect_file_type(file_path: str) -> str:
     """
     Detect the type of file based on extension and contents
@@ -210,9 +213,6 @@ def find_files_by_pattern(directory: str, pattern: str) -> List[str]:
     Returns:
         List[str]: List of matching file paths
     """
-    from glob import glob
-    import os
-    
     # Make directory absolute if it's not
     if not os.path.isabs(directory):
         directory = os.path.abspath(directory)
@@ -250,12 +250,15 @@ def analyze_project_structure(directory: str) -> Dict[str, Any]:
     has_go_mod = os.path.exists(os.path.join(directory, 'go.mod'))
     
     # Walk the directory and count file types
-    for root, _, files in os.walk(directory):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_type = detect_file_type(file_path)
-            file_counts[file_type] = file_counts.get(file_type, 0) + 1
-            total_files += 1
+    for entry in iter_entries(directory):
+        try:
+            if entry.is_dir():
+                continue
+        except OSError:
+            pass
+        file_type = detect_file_type(entry.path)
+        file_counts[file_type] = file_counts.get(file_type, 0) + 1
+        total_files += 1
     
     # Determine main language
     main_language = max(file_counts.items(), key=lambda x: x[1])[0] if file_counts else "unknown"
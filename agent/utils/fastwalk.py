@@ -0,0 +1,133 @@
+"""
+Fast directory walking utilities for the AutoGen Coding Agent.
+This module walks project trees with os.scandir, skipping ignored directories
+by name before touching them and filtering files by extension without
+building path objects.
+"""
+
+import os
+from typing import Iterable, Iterator, Optional
+
+# Directory names that never contain project sources worth embedding
+# (hidden directories such as .git and .mypy_cache are skipped anyway)
+IGNORED_DIRS = frozenset({".git", "node_modules", "__pycache__", ".venv", "venv", ".agent_cache",
+                          "dist", "build"})
+
+# Leaf directories found to hold no matching files, per suffix set:
+# {suffixes: {path: mtime_ns}}. Adding, removing or renaming an entry changes
+# the directory's mtime, so an unchanged mtime means the directory can be skipped.
+_NO_MATCH_DIRS = {}
+
+def iter_source_files(root: str, extensions: Iterable[str],
+                      max_bytes: Optional[int] = None) -> Iterator[os.DirEntry]:
+    """
+    Yield the files under root whose extension is in extensions
+
+    Hidden directories and the names in IGNORED_DIRS are skipped, and
+    symlinks are not followed. Leaf directories that held no matching files
+    on an earlier walk are skipped without listing them while their mtime
+    is unchanged.
+
+    Args:
+        root: Directory to walk
+        extensions: File extensions to include, with the leading dot (e.g. ".py")
+        max_bytes: Skip files larger than this (generated code, lockfiles)
+
+    Returns:
+        Iterator of os.DirEntry objects for the matching files
+    """
+    # Compare suffixes without the dot so matching needs only one slice per file
+    suffixes = frozenset(ext[1:] if ext.startswith(".") else ext for ext in extensions)
+    no_match = _NO_MATCH_DIRS.setdefault(suffixes, {})
+    # (path, mtime_ns) pairs; the root's mtime is not tracked
+    stack = [(root, None)]
+
+    while stack:
+        path, mtime = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+
+        # Set once the directory has a matching file or a subdirectory to walk
+        found = False
+        with it:
+            for entry in it:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not name.startswith(".") and name not in IGNORED_DIRS:
+                            found = True
+                            sub_mtime = entry.stat(follow_symlinks=False).st_mtime_ns
+                            if no_match.get(entry.path) != sub_mtime:
+                                stack.append((entry.path, sub_mtime))
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+
+                # Names like ".env" have no extension
+                dot = name.rfind(".")
+                if dot > 0 and name[dot + 1:] in suffixes:
+                    # Set even for oversized files: shrinking a file does not
+                    # change its directory's mtime
+                    found = True
+                    if max_bytes is not None:
+                        try:
+                            if entry.stat(follow_symlinks=False).st_size > max_bytes:
+                                continue
+                        except OSError:
+                            continue
+                    yield entry
+
+        if mtime is not None:
+            if found:
+                no_match.pop(path, None)
+            else:
+                no_match[path] = mtime
+
+def iter_entries(root: str) -> Iterator[os.DirEntry]:
+    """
+    Yield every file and directory entry under root
+
+    Directories named in IGNORED_DIRS are yielded but not entered, and
+    symlinked directories are not followed, matching os.walk's defaults.
+
+    Args:
+        root: Directory to walk
+
+    Returns:
+        Iterator of os.DirEntry objects
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                yield entry
+                try:
+                    if (entry.is_dir(follow_symlinks=False)
+                            and entry.name not in IGNORED_DIRS):
+                        stack.append(entry.path)
+                except OSError:
+                    pass
+
+def ensure_dir(path: str) -> bool:
+    """
+    Create a directory if it does not exist yet
+
+    Args:
+        path: Directory to create
+
+    Returns:
+        True if the directory was created, False if it already existed
+    """
+    try:
+        os.makedirs(path)
+        return True
+    except FileExistsError:
+        return False
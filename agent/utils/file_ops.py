@@ -30,6 +30,23 @@ def read_file(file_path: str) -> str:
     except Exception as e:
         return f"Error reading {file_path}: {e}"
 
+def read_file_head(file_path: str, n: int) -> str:
+    """
+    Read at most the first n characters of a file
+    
+    Args:
+        file_path (str): Path to the file to read
+        n (int): Maximum number of characters to read
+        
+    Returns:
+        str: Start of the file content or error message
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read(n)
+    except Exception as e:
+        return f"Error reading {file_path}: {e}"
+
 def write_file(file_path: str, content: str) -> str:
     """
     Write content to a file
@@ -63,16 +80,15 @@ def create_file(file_path: str, content: str) -> str:
         str: Success message or error message
     """
     try:
-        # Check if file already exists
-        if os.path.exists(file_path):
-            return f"File {file_path} already exists. Use write_file() to overwrite or apply_diff() to modify."
-        
         # Ensure directory exists
         os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        # Exclusive create: fails atomically if the file already exists
+        with open(file_path, 'x', encoding='utf-8') as f:
             f.write(content)
         return f"Successfully created {file_path}"
+    except FileExistsError:
+        return f"File {file_path} already exists. Use write_file() to overwrite or apply_diff() to modify."
     except Exception as e:
         return f"Error creating {file_path}: {e}"
 
@@ -141,6 +157,12 @@ def apply_code_diff(file_path: str, diff_content: str) -> bool:
         print(f"Error applying diff to {file_path}: {e}")
         return False
 
+def _resolve_tasks_file(tasks_file: str) -> Path:
+    """Resolve a tasks file path; relative paths are relative to the agent directory"""
+    if not os.path.isabs(tasks_file):
+        return Path(__file__).parent.parent / tasks_file
+    return Path(tasks_file)
+
 def load_tasks(tasks_file: str = "tasks.md") -> str:
     """
     Load tasks from tasks.md file
@@ -151,14 +173,31 @@ def load_tasks(tasks_file: str = "tasks.md") -> str:
     Returns:
         str: Content of the tasks file or a message if not found
     """
-    if not os.path.isabs(tasks_file):
-        # If relative path, assume it's relative to the agent directory
-        tasks_path = Path(__file__).parent.parent / tasks_file
-    else:
-        tasks_path = Path(tasks_file)
+    tasks_path = _resolve_tasks_file(tasks_file)
     
     if not tasks_path.exists():
         return f"No tasks file found at {tasks_path}"
     
     with open(tasks_path, 'r', encoding='utf-8') as f:
         return f.read()
+
+def peek_tasks_head(tasks_file: str = "tasks.md", n: int = 100) -> str:
+    """
+    Read only the first characters of the tasks file
+    
+    Equivalent to load_tasks(tasks_file)[:n] without reading the whole file.
+    
+    Args:
+        tasks_file (str): Path to the tasks file, defaults to tasks.md in agent directory
+        n (int): Number of characters to read
+        
+    Returns:
+        str: First n characters of the tasks file (or of the not-found message)
+    """
+    tasks_path = _resolve_tasks_file(tasks_file)
+    
+    try:
+        with open(tasks_path, 'r', encoding='utf-8') as f:
+            return f.read(n)
+    except FileNotFoundError:
+        return f"No tasks file found at {tasks_path}"[:n]
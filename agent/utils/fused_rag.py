@@ -0,0 +1,114 @@
+"""
+Single-pass index-and-query for the codebase.
+This module embeds the codebase into a flat numpy matrix and answers one
+query against it directly, without building or persisting a FAISS index.
+It suits one-off runs where the index would be thrown away after one search.
+"""
+
+import numpy as np
+
+from .code_embedding import (
+    DEFAULT_EXTENSIONS,
+    MAX_FILE_BYTES,
+    MAX_SNIPPET_CHARS,
+    create_embeddings,
+    create_text_splitter,
+    format_search_results,
+    vector_store_options,
+    resolve_code_dir,
+    resolve_tasks_path
+)
+from .embed_cache import build_manifest, load_chunks
+
+# Number of chunks passed to the embedding model at once
+EMBED_BATCH_SIZE = 64
+
+def top_k_indices(scores, k):
+    """
+    Get the indices of the k highest scores, best first
+
+    Args:
+        scores (np.ndarray): One score per chunk
+        k (int): Number of indices to return
+
+    Returns:
+        np.ndarray: Indices into scores
+    """
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(scores.shape[0])
+    return top[np.argsort(-scores[top], kind="stable")]
+
+def _embed_chunks(embeddings, chunks):
+    """Embed chunk texts in batches into one (N, D) float32 matrix"""
+    texts = [chunk.page_content for chunk in chunks]
+    matrix = None
+
+    for start in range(0, len(texts), EMBED_BATCH_SIZE):
+        batch = np.asarray(embeddings.embed_documents(texts[start:start + EMBED_BATCH_SIZE]),
+                           dtype=np.float32)
+        if matrix is None:
+            matrix = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+        matrix[start:start + batch.shape[0]] = batch
+
+    return matrix
+
+def embed_and_query(config, query, code_dir="project-code", file_extensions=None,
+                    tasks_file="tasks.md", k=None):
+    """
+    Embed the codebase and return the code context for a single query
+
+    Ranks chunks by Euclidean distance to the query embedding, or by cosine
+    similarity when rag.metric is "cosine", matching the FAISS store that
+    embed_codebase would build.
+
+    Args:
+        config (dict): Configuration dictionary
+        query (str): Query string
+        code_dir (str): Directory containing the code to embed
+        file_extensions (Iterable[str]): File extensions to include
+        tasks_file (str): Filename of the tasks file
+        k (int, optional): Number of snippets; defaults to rag.similarity_top_k
+
+    Returns:
+        str: Concatenated relevant code snippets, formatted like query_codebase
+    """
+    print(f"Loading and embedding codebase from {code_dir}...")
+
+    rag_config = config.get("rag", {})
+    code_dir = resolve_code_dir(code_dir)
+    if file_extensions is None:
+        file_extensions = DEFAULT_EXTENSIONS
+    if k is None:
+        k = rag_config.get("similarity_top_k", 3)
+
+    tasks_path = resolve_tasks_path(tasks_file)
+    if tasks_path is None:
+        print(f"Warning: Could not find tasks file: {tasks_file}")
+
+    paths = build_manifest(code_dir, file_extensions, tasks_path,
+                           rag_config.get("max_file_bytes", MAX_FILE_BYTES))
+    chunks = load_chunks(paths, create_text_splitter(config))[0]
+    if not chunks:
+        print("Warning: No documents loaded!")
+        return "No code context available. Please ensure the project directory contains files."
+
+    embeddings = create_embeddings(config)
+    chunk_matrix = _embed_chunks(embeddings, chunks)
+    print(f"Embedded {len(paths)} files into {len(chunks)} chunks")
+
+    query_vec = np.asarray(embeddings.embed_query(query), dtype=np.float32)
+    if vector_store_options(config):
+        # Cosine similarity: dot products of unit-length vectors
+        chunk_matrix /= np.maximum(np.linalg.norm(chunk_matrix, axis=1, keepdims=True), 1e-12)
+        scores = chunk_matrix @ query_vec
+    else:
+        # -|x - q|^2 up to a constant: one matrix-vector product plus the row norms
+        scores = 2 * (chunk_matrix @ query_vec) - np.einsum("ij,ij->i", chunk_matrix, chunk_matrix)
+
+    return format_search_results([chunks[i] for i in top_k_indices(scores, k)],
+                                 rag_config.get("max_snippet_chars", MAX_SNIPPET_CHARS))
@@ -0,0 +1,42 @@
+"""
+JSON serialization helpers for the AutoGen Coding Agent.
+This module encodes and decodes JSON with orjson when it is installed and
+falls back to the standard json module otherwise. Both paths produce bytes,
+so callers can write the result straight to a binary file or request body.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """
+    Serialize obj to JSON bytes
+
+    Args:
+        obj: JSON-serializable object
+        indent: Indent nested values by two spaces instead of writing one line
+
+    Returns:
+        bytes: UTF-8 encoded JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+def json_loads(data):
+    """
+    Parse a JSON document
+
+    Args:
+        data: JSON document as str or bytes
+
+    Returns:
+        The decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
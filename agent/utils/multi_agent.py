@@ -8,7 +8,6 @@ from autogen import GroupChat, GroupChatManager
 from typing import Dict, List, Any
 from pathlib import Path
 import os
-import yaml
 import json
 
 from .specialized_agents import (
@@ -20,6 +19,7 @@ from .specialized_agents import (
     get_documentation_agent
 )
 from .file_ops import read_file, write_file, apply_code_diff, create_file, load_tasks
+from .config import load_yaml_file
 
 def load_mcp_config(config_path=None):
     """
@@ -63,13 +63,12 @@ def load_mcp_config(config_path=None):
     # If config file exists, load it
     if config_path and Path(config_path).exists():
         try:
-            with open(config_path, 'r') as f:
-                mcp_config = yaml.safe_load(f)
-                # Merge with defaults
-                for key in default_config:
-                    if key not in mcp_config:
-                        mcp_config[key] = default_config[key]
-                return mcp_config
+            mcp_config = load_yaml_file(config_path)
+            # Merge with defaults
+            for key in default_config:
+                if key not in mcp_config:
+                    mcp_config[key] = default_config[key]
+            return mcp_config
         except Exception as e:
             print(f"Error loading MCP config: {e}")
             return default_config
@@ -163,12 +162,13 @@ def create_agent_group(config, function_map=None, project_type="generic", projec
     )
     
     # Create the group chat manager
+    llm_config = config.get("llm", {})
     manager = GroupChatManager(
         groupchat=group_chat,
         llm_config={
-            "model": config.get("llm", {}).get("model", "gpt-4"),
-            "temperature": config.get("llm", {}).get("temperature", 0.2),
-            "max_tokens": config.get("llm", {}).get("max_tokens", 2000),
+            "model": llm_config.get("model", "gpt-4"),
+            "temperature": llm_config.get("temperature", 0.2),
+            "max_tokens": llm_config.get("max_tokens", 2000),
         }
     )
     
@@ -9,7 +9,9 @@ import os
 import json
 import re
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .fastwalk import iter_entries
 
 def detect_project_type(directory: str) -> Dict[str, Any]:
     """
@@ -54,7 +56,10 @@ def detect_project_type(directory: str) -> Dict[str, Any]:
         os.path.join(directory, 'package.json'),
         ['next']
     )
-    has_django = _check_for_file(directory, 'manage.py') and _check_for_file(directory, 'settings.py')
+    # One walk of the tree answers every file, directory and extension check
+    extension_counts, file_names, dir_names = _scan_tree(directory)
+    
+    has_django = 'manage.py' in file_names and 'settings.py' in file_names
     has_flask = has_requirements_txt and _check_file_for_content(
         os.path.join(directory, 'requirements.txt'),
         ['flask']
@@ -68,9 +73,6 @@ def detect_project_type(directory: str) -> Dict[str, Any]:
         ['rails']
     )
     
-    # Count files by extension
-    extension_counts = count_file_extensions(directory)
-    
     # Determine project type
     if has_react:
         project_type = "react"
@@ -133,12 +135,12 @@ def detect_project_type(directory: str) -> Dict[str, Any]:
     
     # Determine if this is a game
     is_game = (
-        _check_for_directory(directory, 'assets') and 
-        (_check_for_directory(directory, 'sprites') or _check_for_directory(directory, 'textures') or 
-         _check_for_directory(directory, 'models')) or
-        _check_for_file(directory, 'game.js') or
-        _check_for_file(directory, 'game.py') or
-        _check_for_file(directory, 'game.ts')
+        'assets' in dir_names and 
+        ('sprites' in dir_names or 'textures' in dir_names or 
+         'models' in dir_names) or
+        'game.js' in file_names or
+        'game.py' in file_names or
+        'game.ts' in file_names
     )
     
     if is_game:
@@ -213,18 +215,38 @@ def count_file_extensions(directory: str) -> Dict[str, int]:
     Returns:
         Dict: Dictionary with extension counts
     """
+    return _scan_tree(directory)[0]
+
+def _scan_tree(directory: str) -> Tuple[Dict[str, int], Set[str], Set[str]]:
+    """
+    Walk a directory tree once, skipping vendored and cache directories
+    
+    Args:
+        directory: Directory to analyze
+        
+    Returns:
+        Tuple: Extension counts, file names and directory names found in the tree
+    """
     extension_counts = {}
+    file_names = set()
+    dir_names = set()
     
-    for root, _, files in os.walk(directory):
-        for file in files:
-            # Get the file extension
-            _, ext = os.path.splitext(file)
-            ext = ext.lower()
-            
-            # Increment the count for this extension
-            extension_counts[ext] = extension_counts.get(ext, 0) + 1
+    for entry in iter_entries(directory):
+        name = entry.name
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            dir_names.add(name)
+            continue
+        
+        file_names.add(name)
+        # Get the file extension
+        ext = os.path.splitext(name)[1].lower()
+        extension_counts[ext] = extension_counts.get(ext, 0) + 1
     
-    return extension_counts
+    return extension_counts, file_names, dir_names
 
 def _check_file_for_content(file_path: str, search_strings: List[str]) -> bool:
     """
@@ -253,38 +275,6 @@ def _check_file_for_content(file_path: str, search_strings: List[str]) -> bool:
     
     return False
 
-def _check_for_file(directory: str, filename: str) -> bool:
-    """
-    Check if a file exists anywhere in a directory tree
-    
-    Args:
-        directory: Base directory to search
-        filename: Filename to look for
-        
-    Returns:
-        bool: True if file is found
-    """
-    for root, _, files in os.walk(directory):
-        if filename in files:
-            return True
-    return False
-
-def _check_for_directory(directory: str, dirname: str) -> bool:
-    """
-    Check if a directory exists anywhere in a directory tree
-    
-    Args:
-        directory: Base directory to search
-        dirname: Directory name to look for
-        
-    Returns:
-        bool: True if directory is found
-    """
-    for root, dirs, _ in os.walk(directory):
-        if dirname in dirs:
-            return True
-    return False
-
 def get_project_system_message(project_info: Dict[str, Any]) -> str:
     """
     Generate a specialized system message for a project type
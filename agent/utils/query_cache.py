@@ -0,0 +1,174 @@
+"""
+Semantic query cache for codebase retrieval.
+This module caches query_codebase results so that repeated or near-identical
+queries skip the vector search. Lookups first try an exact hash match and then
+a cosine-similarity match against the embeddings of previous queries.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+class SemanticQueryCache:
+    """
+    Two-level (exact + semantic) cache of query results, persisted in SQLite
+    """
+
+    def __init__(self, db_path: str, threshold: float = 0.95, ttl: float = 3600):
+        """
+        Initialize the cache
+
+        Args:
+            db_path: Path of the SQLite file backing the cache
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl: Seconds after which an entry is no longer served
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+        self.ttl = ttl
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS queries ("
+            "query_hash TEXT PRIMARY KEY, embedding BLOB, context TEXT, created_at REAL)"
+        )
+
+        # In-memory mirror: row i of the matrix belongs to self._entries[i]
+        self._entries: List[Tuple[str, str, float]] = []
+        self._index_by_hash = {}
+        self._matrix = None
+        self._size = 0
+
+        for query_hash, blob, context, created_at in self.conn.execute(
+                "SELECT query_hash, embedding, context, created_at FROM queries ORDER BY created_at"):
+            self._append(query_hash, np.frombuffer(blob, dtype=np.float32), context, created_at)
+
+    @staticmethod
+    def _hash(query: str) -> str:
+        return hashlib.sha1(query.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def _append(self, query_hash: str, vec: np.ndarray, context: str, created_at: float):
+        """Add an entry to the in-memory matrix, growing it by doubling"""
+        if query_hash in self._index_by_hash:
+            i = self._index_by_hash[query_hash]
+            self._matrix[i] = vec
+            self._entries[i] = (query_hash, context, created_at)
+            return
+
+        if self._matrix is None:
+            self._matrix = np.zeros((16, vec.shape[0]), dtype=np.float32)
+        elif self._size == self._matrix.shape[0]:
+            grown = np.zeros((self._size * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix
+            self._matrix = grown
+
+        self._matrix[self._size] = vec
+        self._index_by_hash[query_hash] = self._size
+        self._entries.append((query_hash, context, created_at))
+        self._size += 1
+
+    def _lookup(self, query: str, embed_fn: Callable, threshold: float, ttl: float):
+        """Return (context or None, query embedding as returned by embed_fn or None)"""
+        now = time.time()
+
+        i = self._index_by_hash.get(self._hash(query))
+        if i is not None and now - self._entries[i][2] <= ttl:
+            return self._entries[i][1], None
+
+        embedding = np.asarray(embed_fn(query), dtype=np.float32)
+        vec = self._normalize(embedding)
+        if self._size == 0 or vec.shape[0] != self._matrix.shape[1]:
+            return None, embedding
+
+        # One matrix-vector product against every cached query
+        sims = self._matrix[:self._size] @ vec
+        for j in np.argsort(sims)[::-1]:
+            if sims[j] < threshold:
+                break
+            if now - self._entries[j][2] <= ttl:
+                return self._entries[j][1], embedding
+        return None, embedding
+
+    def get(self, query: str, embed_fn: Callable, threshold: Optional[float] = None,
+            ttl: Optional[float] = None) -> Optional[str]:
+        """
+        Look up a cached result for a query
+
+        Args:
+            query: Query string
+            embed_fn: Function mapping a query string to its embedding
+            threshold: Override of the cosine-similarity threshold
+            ttl: Override of the entry lifetime in seconds
+
+        Returns:
+            Cached context string, or None on a miss
+        """
+        context, _ = self._lookup(
+            query, embed_fn,
+            self.threshold if threshold is None else threshold,
+            self.ttl if ttl is None else ttl
+        )
+        return context
+
+    def put(self, query: str, vec, context: str):
+        """
+        Store a query result
+
+        Args:
+            query: Query string
+            vec: Embedding of the query
+            context: Result to cache
+        """
+        query_hash = self._hash(query)
+        vec = self._normalize(vec)
+        created_at = time.time()
+
+        self._append(query_hash, vec, context, created_at)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO queries VALUES (?, ?, ?, ?)",
+                (query_hash, vec.tobytes(), context, created_at)
+            )
+
+    def get_or_compute(self, query: str, compute_fn: Callable[..., str], embed_fn: Callable,
+                       pass_embedding: bool = False) -> str:
+        """
+        Return the cached result for a query, computing and caching it on a miss
+
+        Args:
+            query: Query string
+            compute_fn: Function producing the result for a query
+            embed_fn: Function mapping a query string to its embedding
+            pass_embedding: Call compute_fn(query, embedding) with the embedding
+                made for the lookup, so a miss does not embed the query twice
+
+        Returns:
+            Context string
+        """
+        context, embedding = self._lookup(query, embed_fn, self.threshold, self.ttl)
+        if context is not None:
+            return context
+
+        context = compute_fn(query, embedding) if pass_embedding else compute_fn(query)
+        self.put(query, embedding, context)
+        return context
+
+    def close(self):
+        """Close the underlying SQLite connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
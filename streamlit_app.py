@@ -639,10 +639,13 @@ def generate_project_with_llm(project_dir, project_type, tasks_content, provider
     import json
     import re
     
+    # One session for all the calls below, so they reuse the same connection
+    session = requests.Session()
+    
     def call_llm(prompt):
         """Call LM Studio API directly"""
         try:
-            response = requests.post(
+            response = session.post(
                 "http://localhost:1234/v1/chat/completions",
                 headers={"Content-Type": "application/json"},
                 json={
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Test the cost-efficient task system
+
+Covers agent.utils.cost_efficient_ops: target paths and prepending in
+TaskExecutorAgent, both task metadata backends, session history in
+TaskMemory (store, read, rollback, torn lines and conversion of the older
+single-array files) and plan reuse in LLMPlannerAgent.
+
+Run with pytest or directly.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from agent.utils.cost_efficient_ops import (
+    LLMPlannerAgent, StructuredTaskProcessor, TaskExecutorAgent, TaskMemory, TaskMetadataStore,
+    TaskMetadataStoreSQLite, TASK_STORE_ENV, create_task_store,
+)
+
+class FakeLLM:
+    """Returns a fixed plan from generate and counts the calls"""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return json.loads(json.dumps(self.plan))
+
+def test_target_paths_normalized():
+    """Different spellings of one target report one path and run in order"""
+    with tempfile.TemporaryDirectory() as root:
+        executor = TaskExecutorAgent(root)
+        spellings = ["sub/a.txt", "./sub//a.txt", "sub/./a.txt", "sub/x/../a.txt"]
+        tasks = [{"type": "file_creation", "target": spellings[0], "content": "0"}]
+        tasks += [{"type": "file_modification", "target": target, "modification": "append",
+                   "content": str(i)} for i, target in enumerate(spellings[1:], 1)]
+        task_ids = executor.metadata_store.store_batch_tasks(tasks)["task_ids"]
+
+        result = executor.execute_batch_tasks(task_ids)
+        assert result["tasks_executed"] == len(spellings)
+        expected = os.path.join(root, "sub", "a.txt")
+        assert {r["target"] for r in result["detailed_results"]} == {expected}
+        with open(expected) as f:
+            assert f.read() == "0123"
+
+def test_prepend_utf8_through_symlink():
+    """Prepended text is UTF-8 and a symlinked target keeps its link"""
+    with tempfile.TemporaryDirectory() as root:
+        executor = TaskExecutorAgent(root)
+        real = os.path.join(root, "real.txt")
+        with open(real, "wb") as f:
+            f.write("wörld\n".encode("utf-8"))
+        os.chmod(real, 0o640)
+        os.symlink("real.txt", os.path.join(root, "link.txt"))
+
+        executor.metadata_store.store_task({"task_id": "p1", "type": "file_modification",
+                                            "target": "link.txt", "modification": "prepend",
+                                            "content": "héllo "})
+        assert executor.execute_task("p1")["success"]
+        assert os.path.islink(os.path.join(root, "link.txt"))
+        with open(real, "rb") as f:
+            assert f.read() == "héllo wörld\n".encode("utf-8")
+        assert os.stat(real).st_mode & 0o777 == 0o640
+        assert os.listdir(root).count("real.txt.part") == 0
+
+def _round_trip(store):
+    task = {"task_id": "t1", "type": "file_creation", "target": "a.txt",
+            "content": "héllo", "status": "pending"}
+    assert store.store_task(task)["success"]
+    stored = store.get_task("t1")
+    assert stored["content"] == "héllo" and stored["status"] == "pending"
+    assert store.get_task("missing") is None
+
+    batch = store.store_batch_tasks([{"type": "file_creation", "target": f"{i}.txt",
+                                      "content": str(i)} for i in range(3)])
+    assert batch["success"] and batch["tasks_stored"] == 3
+    assert [store.get_task(task_id)["content"] for task_id in batch["task_ids"]] == ["0", "1", "2"]
+
+    result = store.update_task_status("t1", "completed", execution_result={"success": True})
+    assert result["success"] and result["task_id"] == "t1"
+    stored = store.get_task("t1")
+    assert stored["status"] == "completed" and stored["execution_result"] == {"success": True}
+    assert stored["content"] == "héllo"
+    assert not store.update_task_status("missing", "completed")["success"]
+
+def test_task_store_backends():
+    """Both backends round-trip tasks, chosen by argument or AGENT_TASK_STORE"""
+    original = os.environ.pop(TASK_STORE_ENV, None)
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            json_store = create_task_store(os.path.join(root, "json"))
+            assert type(json_store) is TaskMetadataStore
+            _round_trip(json_store)
+
+            sqlite_store = create_task_store(os.path.join(root, "sqlite"), "SQLite")
+            assert isinstance(sqlite_store, TaskMetadataStoreSQLite)
+            _round_trip(sqlite_store)
+
+            os.environ[TASK_STORE_ENV] = "sqlite"
+            env_store = create_task_store(os.path.join(root, "sqlite"))
+            assert isinstance(env_store, TaskMetadataStoreSQLite)
+            assert env_store.get_task("t1")["status"] == "completed"
+            assert isinstance(create_task_store(root, "json"), TaskMetadataStore)
+
+            for backend in ("redis", None):
+                os.environ[TASK_STORE_ENV] = "redis"
+                try:
+                    create_task_store(root, backend)
+                except ValueError:
+                    pass
+                else:
+                    raise AssertionError("unknown backend accepted")
+    finally:
+        os.environ.pop(TASK_STORE_ENV, None)
+        if original is not None:
+            os.environ[TASK_STORE_ENV] = original
+
+def test_sqlite_concurrent_updates():
+    """Concurrent status updates of one task keep every field"""
+    with tempfile.TemporaryDirectory() as root:
+        store = TaskMetadataStoreSQLite(root)
+        store.store_task({"task_id": "t1", "status": "pending"})
+
+        def update(i):
+            assert store.update_task_status("t1", "executing", **{f"field_{i}": i})["success"]
+
+        threads = [threading.Thread(target=update, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        task = store.get_task("t1")
+        assert all(task[f"field_{i}"] == i for i in range(16))
+
+def _record(task_id, session_id="s1"):
+    return {"session_id": session_id, "task_id": task_id, "status": "completed"}
+
+def test_session_store_read_rollback():
+    """Records come back in order and rollback drops the ones after the target"""
+    with tempfile.TemporaryDirectory() as root:
+        memory = TaskMemory(root)
+        for task_id in ("t1", "t2", "t3"):
+            assert memory.store_execution(_record(task_id))["success"]
+
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1", "t2", "t3"]
+        assert memory.get_session_history("missing") == []
+
+        result = memory.rollback_to_state("s1", "t1")
+        assert result["success"] and result["states_removed"] == 2
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1"]
+        assert not memory.rollback_to_state("s1", "t3")["success"]
+
+        # Appending after a rollback continues from the target state
+        memory.store_execution(_record("t4"))
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1", "t4"]
+
+def test_session_torn_line():
+    """A record stored after an interrupted write is kept"""
+    with tempfile.TemporaryDirectory() as root:
+        memory = TaskMemory(root)
+        memory.store_execution(_record("t1"))
+        session_file = memory.memory_dir / "session_s1.jsonl"
+        with open(session_file, "ab") as f:
+            f.write(b'{"session_id": "s1", "task_')
+
+        memory.store_execution(_record("t2"))
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1", "t2"]
+
+def test_session_legacy_conversion():
+    """A legacy history is read as is and converted, with a backup, on write"""
+    with tempfile.TemporaryDirectory() as root:
+        memory = TaskMemory(root)
+        legacy_file = memory.memory_dir / "session_s1.json"
+        session_file = memory.memory_dir / "session_s1.jsonl"
+        with open(legacy_file, "w") as f:
+            json.dump([_record("t1"), _record("t2")], f)
+
+        # Reading does not touch the files
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1", "t2"]
+        assert legacy_file.exists() and not session_file.exists()
+
+        # A leftover from an interrupted conversion is replaced
+        with open(str(session_file) + ".part", "wb") as f:
+            f.write(b'{"task_id": "t1"')
+
+        memory.store_execution(_record("t3"))
+        assert [r["task_id"] for r in memory.get_session_history("s1")] == ["t1", "t2", "t3"]
+        assert not legacy_file.exists()
+        assert not os.path.exists(str(session_file) + ".part")
+        with open(str(legacy_file) + ".bak") as f:
+            assert len(json.load(f)) == 2
+
+        assert memory.rollback_to_state("s1", "t2")["states_removed"] == 1
+
+def test_plan_cache():
+    """A repeated request makes no LLM call and gets its own copy of the plan"""
+    plan = {"task_type": "file_creation", "target_file": "story.txt",
+            "content": "Once upon a time", "reasoning": "one file"}
+    llm = FakeLLM(plan)
+    planner = LLMPlannerAgent(llm)
+
+    first = planner.create_execution_plan("write a story")
+    first["plan"]["content"] = "changed"
+    second = planner.create_execution_plan("write a story")
+    assert llm.calls == 1
+    assert first["cost_used"] and not second["cost_used"]
+    assert second["plan"]["content"] == "Once upon a time"
+    second["plan"]["content"] = "changed again"
+    assert planner.create_execution_plan("write a story")["plan"]["content"] == "Once upon a time"
+    assert planner.get_cost_summary()["plan_cache_hits"] == 2
+
+    # A malformed plan is asked for again instead of being reused
+    broken = FakeLLM({"task_type": "file_creation"})
+    planner = LLMPlannerAgent(broken)
+    planner.create_execution_plan("write a story")
+    planner.create_execution_plan("write a story")
+    assert broken.calls == 2
+
+def test_plan_cache_not_counted_as_llm_request():
+    """Requests answered from the plan cache do not count as LLM requests"""
+    with tempfile.TemporaryDirectory() as root:
+        llm = FakeLLM({"task_type": "file_creation", "target_file": "story.txt",
+                       "content": "Once upon a time"})
+        processor = StructuredTaskProcessor(root, llm)
+        for _ in range(2):
+            result = processor.process_user_request("write a creative story")
+            assert result["success"] and result["llm_used"]
+
+        assert llm.calls == 1
+        summary = processor.get_optimization_summary()
+        assert summary["total_requests"] == 2
+        assert summary["llm_requests"] == 1
+        assert summary["ai_usage_percentage"] == 50.0
+        with open(os.path.join(root, "story.txt")) as f:
+            assert f.read() == "Once upon a time"
+
+if __name__ == "__main__":
+    print("🧪 Testing Cost-Efficient Task System")
+    print("=" * 40)
+    failed = False
+    for name, test in list(globals().items()):
+        if not name.startswith("test_") or not callable(test):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except Exception as e:
+            failed = True
+            print(f"❌ {name}: {e!r}")
+            import traceback
+            traceback.print_exc()
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test the incremental updates of the on-disk embedding cache
+
+Runs load_or_build_db over a temporary codebase through each kind of change
+(unchanged, touched, edited, added, removed, everything removed, HNSW
+rebuild) and checks after every run that the chunk ids recorded in the
+manifest match the documents in the FAISS index. A fake embedding model
+stands in for sentence-transformers, so no model is downloaded.
+
+Needs faiss and langchain; run with pytest or directly.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add the project root to the Python path
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from langchain.embeddings.base import Embeddings
+
+from agent.utils import embed_cache
+from agent.utils.embed_cache import get_cache_dir, load_or_build_db, MANIFEST_FILE
+
+# Dimension of the fake embeddings
+DIM = 16
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embeddings derived from a hash of the text, counting embedded texts"""
+
+    def __init__(self):
+        self.embedded = 0
+
+    def _vector(self, text):
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=DIM).digest()
+        return (np.frombuffer(digest, dtype=np.uint8).astype(np.float32) / 255.0).tolist()
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._vector(text)
+
+def _config(index_type="flat"):
+    return {"rag": {"chunk_size": 200, "chunk_overlap": 20, "index_type": index_type,
+                    "use_gpu": False}}
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def _source(name, lines):
+    """Python source long enough to be split into several chunks"""
+    return "\n".join(f"def {name}_{i}():\n    return {i}\n" for i in range(lines))
+
+class _Workspace:
+    """A temporary codebase with load_or_build_db wired to FakeEmbeddings"""
+
+    def __init__(self, root, index_type="flat"):
+        self.code_dir = os.path.join(root, "code")
+        self.tasks_file = os.path.join(root, "no-tasks.md")
+        self.config = _config(index_type)
+        self.embeddings = FakeEmbeddings()
+        os.makedirs(self.code_dir)
+
+    def path(self, name):
+        return os.path.join(self.code_dir, name)
+
+    def load(self):
+        before = self.embeddings.embedded
+        db = load_or_build_db(self.config, self.code_dir, [".py"], self.tasks_file)
+        return db, self.embeddings.embedded - before
+
+    def manifest(self):
+        cache_dir = get_cache_dir(self.config, self.code_dir)
+        with open(os.path.join(cache_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)["files"]
+
+    def check_consistent(self, db):
+        """The manifest's chunk ids are exactly the documents in the index"""
+        files = self.manifest()
+        manifest_ids = {chunk_id for entry in files.values() for chunk_id in entry["ids"]}
+        index_ids = set(db.index_to_docstore_id.values())
+        assert manifest_ids == index_ids, (manifest_ids ^ index_ids)
+        assert db.index.ntotal == len(index_ids)
+        for chunk_id in index_ids:
+            path = chunk_id.rsplit("#", 1)[0]
+            assert db.docstore.search(chunk_id).metadata["source"] == path
+        return files
+
+def _run(test, index_type="flat"):
+    """Run test(workspace) in a fresh directory with FakeEmbeddings patched in"""
+    original_cwd = os.getcwd()
+    original_create = embed_cache.create_embeddings
+    with tempfile.TemporaryDirectory() as root:
+        workspace = _Workspace(root, index_type)
+        embed_cache.create_embeddings = lambda config: workspace.embeddings
+        # The cache lives in .agent_cache under the working directory
+        os.chdir(root)
+        try:
+            test(workspace)
+        finally:
+            os.chdir(original_cwd)
+            embed_cache.create_embeddings = original_create
+
+def _incremental_updates(ws):
+    _write(ws.path("a.py"), _source("a", 20))
+    _write(ws.path("b.py"), _source("b", 20))
+
+    # Cold start embeds every chunk
+    db, embedded = ws.load()
+    files = ws.check_consistent(db)
+    assert embedded == db.index.ntotal > 2
+    assert set(files) == {ws.path("a.py"), ws.path("b.py")}
+
+    # Unchanged: the index is memory-mapped and nothing is embedded
+    db, embedded = ws.load()
+    assert embedded == 0
+    ws.check_consistent(db)
+    assert len(db.similarity_search("def a_3", k=2)) == 2
+
+    # Touched only: the stored stat is refreshed without re-embedding
+    st = os.stat(ws.path("a.py"))
+    os.utime(ws.path("a.py"), ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    db, embedded = ws.load()
+    assert embedded == 0
+    files = ws.check_consistent(db)
+    assert files[ws.path("a.py")]["stat"][0] == st.st_mtime_ns + 10**9
+
+    # Edited: a.py's old chunks are replaced; only new chunk texts are embedded
+    old_b_ids = files[ws.path("b.py")]["ids"]
+    _write(ws.path("a.py"), _source("a", 5) + "\n# edited\n")
+    db, embedded = ws.load()
+    files = ws.check_consistent(db)
+    assert 0 < embedded <= len(files[ws.path("a.py")]["ids"])
+    assert files[ws.path("b.py")]["ids"] == old_b_ids
+
+    # Added and removed in one run
+    _write(ws.path("c.py"), _source("c", 10))
+    os.remove(ws.path("b.py"))
+    db, embedded = ws.load()
+    files = ws.check_consistent(db)
+    assert set(files) == {ws.path("a.py"), ws.path("c.py")}
+
+    # Everything removed: the last file left has no chunks, so the cache is reset
+    os.remove(ws.path("c.py"))
+    _write(ws.path("a.py"), "")
+    db, embedded = ws.load()
+    assert db is None
+    assert not os.path.exists(get_cache_dir(ws.config, ws.code_dir))
+
+    # And the next run starts cold again; the empty file is kept without chunks
+    _write(ws.path("d.py"), _source("d", 10))
+    db, embedded = ws.load()
+    files = ws.check_consistent(db)
+    assert set(files) == {ws.path("a.py"), ws.path("d.py")}
+    assert files[ws.path("a.py")]["ids"] == []
+
+def _hnsw_rebuild(ws):
+    _write(ws.path("a.py"), _source("a", 20))
+    _write(ws.path("b.py"), _source("b", 20))
+    db, _ = ws.load()
+    ws.check_consistent(db)
+
+    # HNSW cannot remove vectors, so an edit rebuilds the index from the chunk cache
+    _write(ws.path("a.py"), _source("a", 8))
+    db, embedded = ws.load()
+    files = ws.check_consistent(db)
+    assert embedded == 0  # a.py's new chunks are a prefix of its old ones
+    assert set(files) == {ws.path("a.py"), ws.path("b.py")}
+
+def test_incremental_updates():
+    """Flat index: unchanged, touched, edited, added, removed and reset"""
+    _run(_incremental_updates)
+
+def test_hnsw_rebuild():
+    """HNSW index: removal falls back to a rebuild that keeps ids in sync"""
+    _run(_hnsw_rebuild, index_type="hnsw")
+
+if __name__ == "__main__":
+    print("🧪 Testing Embedding Cache")
+    print("=" * 40)
+    failed = False
+    for test in (test_incremental_updates, test_hnsw_rebuild):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e!r}")
+            import traceback
+            traceback.print_exc()
+    if failed:
+        sys.exit(1)